@@ -0,0 +1,15 @@
+# Gunicorn settings shared by the Procfile and render.yaml.
+#
+# WEB_SERVER_MODE=wsgi (default) runs classic sync workers;
+# WEB_SERVER_MODE=asgi runs uvicorn workers so the async catalog views
+# (home, product list/detail and the list APIs) can overlap database waits.
+import os
+
+mode = os.environ.get("WEB_SERVER_MODE", "wsgi").lower()
+if mode == "asgi":
+    wsgi_app = "harvest_helper.asgi:application"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "harvest_helper.wsgi:application"
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
@@ -44,6 +44,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'whitenoise.middleware.WhiteNoiseMiddleware',
+    'marketplace.instrumentation.RequestMetricsMiddleware',
+    'marketplace.db_routing.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -57,7 +59,9 @@ ROOT_URLCONF = 'harvest_helper.urls'
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # DjangoTemplates that reports render time to the request metrics.
+        'BACKEND': 'marketplace.instrumentation.TimedDjangoTemplates',
+        'NAME': 'django',
         'DIRS': [BASE_DIR / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -77,7 +81,36 @@ WSGI_APPLICATION = 'harvest_helper.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
-import dj_database_url
+from .database import conn_max_age, database_from_url, replica_databases
+
+# Connection reuse. Sync workers keep each connection for
+# DATABASE_CONN_MAX_AGE seconds and ping it before reuse. Django advises
+# against persistent connections under ASGI, so they are off by default there.
+# DATABASE_POOL=True uses psycopg's connection pool instead (PostgreSQL only,
+# needs psycopg-pool); Django requires CONN_MAX_AGE=0 alongside it. Every
+# gunicorn worker opens its own pool, so keep
+# workers * DATABASE_POOL_MAX_SIZE below the server's max_connections.
+# Behind PgBouncer in transaction mode set DATABASE_DISABLE_SERVER_SIDE_CURSORS,
+# which the streaming exports would otherwise use.
+DATABASE_POOL = config('DATABASE_POOL', default=False, cast=bool)
+DATABASE_POOL_OPTIONS = {
+    'min_size': config('DATABASE_POOL_MIN_SIZE', default=2, cast=int),
+    'max_size': config('DATABASE_POOL_MAX_SIZE', default=10, cast=int),
+    'timeout': config('DATABASE_POOL_TIMEOUT', default=10, cast=int),
+}
+DATABASE_CONN_MAX_AGE = conn_max_age(
+    config('DATABASE_CONN_MAX_AGE', default=''),
+    pool=DATABASE_POOL,
+    server_mode=config('WEB_SERVER_MODE', default='wsgi'),
+)
+DATABASE_CONN_HEALTH_CHECKS = config('DATABASE_CONN_HEALTH_CHECKS', default=True, cast=bool)
+DATABASE_CONNECTION_OPTIONS = {
+    'conn_max_age': DATABASE_CONN_MAX_AGE,
+    'conn_health_checks': DATABASE_CONN_HEALTH_CHECKS,
+    'pool_options': DATABASE_POOL_OPTIONS if DATABASE_POOL else None,
+    'disable_server_side_cursors': config('DATABASE_DISABLE_SERVER_SIDE_CURSORS', default=False, cast=bool),
+}
+
 
 # Try to get DATABASE_URL from environment
 database_url = config('DATABASE_URL', default='')
@@ -85,7 +118,7 @@ database_url = config('DATABASE_URL', default='')
 if database_url:
     # Use Render PostgreSQL database
     DATABASES = {
-        'default': dj_database_url.parse(database_url)
+        'default': database_from_url(database_url, **DATABASE_CONNECTION_OPTIONS)
     }
 else:
     # Fallback to SQLite for local development
@@ -93,9 +126,60 @@ else:
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
             'NAME': BASE_DIR / 'db.sqlite3',
+            'CONN_MAX_AGE': DATABASE_CONN_MAX_AGE,
+            'CONN_HEALTH_CHECKS': DATABASE_CONN_HEALTH_CHECKS,
         }
     }
 
+# Optional read replicas, comma-separated URLs exposed as replica_1, replica_2, ...
+# marketplace.db_routing sends catalog reads of REPLICA_READ_VIEWS to one of
+# them; a client that writes reads from the primary for REPLICA_PIN_SECONDS.
+# Tests mirror the replicas onto the test database.
+_replicas = replica_databases(
+    config('DATABASE_REPLICA_URLS', default='', cast=Csv()), **DATABASE_CONNECTION_OPTIONS
+)
+DATABASES.update(_replicas)
+DATABASE_REPLICAS = list(_replicas)
+DATABASE_ROUTERS = ['marketplace.db_routing.ReplicaRouter']
+REPLICA_READ_VIEWS = ['home', 'product_list', 'product_detail', 'api_products', 'api_categories']
+REPLICA_PIN_SECONDS = config('REPLICA_PIN_SECONDS', default=5, cast=int)
+
+
+# Cache
+# CACHE_BACKEND selects locmem (default, per process), file or redis.
+# Use file or redis when running several gunicorn workers so that
+# invalidation reaches every worker; redis needs the redis package.
+
+CACHE_BACKEND = config('CACHE_BACKEND', default='locmem')
+CACHE_BACKENDS = {
+    'locmem': ('django.core.cache.backends.locmem.LocMemCache', 'harvest-helper'),
+    'file': ('django.core.cache.backends.filebased.FileBasedCache', str(BASE_DIR / '.django_cache')),
+    'redis': ('django.core.cache.backends.redis.RedisCache', 'redis://127.0.0.1:6379/1'),
+}
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKENDS[CACHE_BACKEND][0],
+        'LOCATION': config('CACHE_LOCATION', default=CACHE_BACKENDS[CACHE_BACKEND][1]),
+    }
+}
+FRAGMENT_CACHE_TIMEOUT = config('FRAGMENT_CACHE_TIMEOUT', default=300, cast=int)
+
+# Background jobs (marketplace.jobs). Workers run `python manage.py run_jobs`
+# (the Procfile's worker process); JOBS_RUN_INLINE runs each job in-process
+# after its transaction commits instead. It is on with DEBUG so rollups, image
+# derivatives and password reset mail still happen without a worker in dev.
+JOBS_RUN_INLINE = config('JOBS_RUN_INLINE', default=DEBUG, cast=bool)
+JOBS_MAX_ATTEMPTS = config('JOBS_MAX_ATTEMPTS', default=5, cast=int)
+JOBS_RETRY_DELAY = config('JOBS_RETRY_DELAY', default=10, cast=int)
+JOBS_RETRY_MAX_DELAY = config('JOBS_RETRY_MAX_DELAY', default=3600, cast=int)
+
+# Per-request metrics (marketplace.instrumentation): Server-Timing headers, a log
+# line per request and a rolling per-view summary for staff at /ops/metrics/.
+# REQUEST_METRICS_DEBUG also warns about queries repeated within one request.
+REQUEST_METRICS_ENABLED = config('REQUEST_METRICS_ENABLED', default=True, cast=bool)
+REQUEST_METRICS_WINDOW = config('REQUEST_METRICS_WINDOW', default=500, cast=int)
+REQUEST_METRICS_DEBUG = config('REQUEST_METRICS_DEBUG', default=DEBUG, cast=bool)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -138,6 +222,9 @@ STATIC_ROOT = BASE_DIR / 'staticfiles'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Widths (in pixels) of the WebP/JPEG copies generated for product images.
+PRODUCT_IMAGE_WIDTHS = [320, 640, 960]
+
 # Whitenoise configuration
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
@@ -150,10 +237,37 @@ REST_FRAMEWORK = {
         'rest_framework.authentication.SessionAuthentication',
         'rest_framework.authentication.BasicAuthentication',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'marketplace.pagination.KeysetPagination',
+    'PAGE_SIZE': 24,
 }
 
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'
 
+# Request lines carry their fields as key=value pairs. runserver already
+# prints every request, so with DEBUG only repeated-query warnings show.
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'key_value': {
+            '()': 'marketplace.instrumentation.KeyValueFormatter',
+            'format': '%(asctime)s %(levelname)s %(name)s %(message)s',
+        },
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+        'request_console': {'class': 'logging.StreamHandler', 'formatter': 'key_value'},
+    },
+    'loggers': {
+        'marketplace': {'handlers': ['console'], 'level': config('MARKETPLACE_LOG_LEVEL', default='INFO')},
+        'marketplace.instrumentation': {
+            'handlers': ['request_console'],
+            'level': config('REQUEST_LOG_LEVEL', default='WARNING' if DEBUG else 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -0,0 +1,48 @@
+"""DATABASES entries derived from the environment values read in ``base``.
+
+Kept free of ``config()`` calls so the derivation can be tested with any
+combination of URL, server mode and pool settings.
+"""
+
+import dj_database_url
+
+POSTGRESQL_ENGINE = 'django.db.backends.postgresql'
+
+
+def conn_max_age(configured, *, pool, server_mode):
+    """Seconds a worker keeps a connection open.
+
+    Always 0 with a connection pool, which Django requires. Otherwise the
+    configured value, or a default of 60 under WSGI and 0 under ASGI, where
+    Django advises against persistent connections.
+    """
+    if pool:
+        return 0
+    if configured not in (None, ''):
+        return int(configured)
+    return 0 if server_mode.lower() == 'asgi' else 60
+
+
+def database_from_url(url, *, conn_max_age, conn_health_checks, pool_options=None,
+                      disable_server_side_cursors=False):
+    """Parse ``url`` into a DATABASES entry; ``pool_options`` only apply to PostgreSQL."""
+    database = dj_database_url.parse(
+        url,
+        conn_max_age=conn_max_age,
+        conn_health_checks=conn_health_checks,
+        disable_server_side_cursors=disable_server_side_cursors,
+    )
+    if pool_options is not None and database['ENGINE'] == POSTGRESQL_ENGINE:
+        database.setdefault('OPTIONS', {})['pool'] = dict(pool_options)
+    return database
+
+
+def replica_databases(urls, **options):
+    """``{"replica_1": ..., ...}`` for ``urls``, with the same options as the primary.
+
+    Tests mirror every replica onto the test database.
+    """
+    return {
+        f'replica_{index}': {**database_from_url(url, **options), 'TEST': {'MIRROR': 'default'}}
+        for index, url in enumerate(urls, start=1)
+    }
@@ -1,6 +1,20 @@
 from django.contrib import admin
-
-from .models import Cart, CartItem, Category, Order, OrderItem, Product, Review, UserProfile
+from django.utils import timezone
+
+from .jobs import enqueue
+from .models import (
+    Cart,
+    CartItem,
+    Category,
+    Job,
+    Order,
+    OrderItem,
+    Product,
+    Review,
+    SellerDailySales,
+    SlugHistory,
+    UserProfile,
+)
 
 
 @admin.register(Category)
@@ -11,11 +25,16 @@ class CategoryAdmin(admin.ModelAdmin):
 
 @admin.register(Product)
 class ProductAdmin(admin.ModelAdmin):
-    list_display = ("name", "category", "seller", "price", "stock", "is_featured")
+    list_display = ("name", "category", "seller", "price", "stock", "is_featured", "avg_rating", "rating_count")
     list_filter = ("category", "is_featured")
     search_fields = ("name", "description")
     prepopulated_fields = {"slug": ("name",)}
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        if "image" in form.changed_data:
+            enqueue("images.generate_product_derivatives", {"product_id": obj.pk})
+
 
 class CartItemInline(admin.TabularInline):
     model = CartItem
@@ -47,3 +66,31 @@ class ReviewAdmin(admin.ModelAdmin):
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
     list_display = ("user", "is_seller")
+
+
+@admin.register(SellerDailySales)
+class SellerDailySalesAdmin(admin.ModelAdmin):
+    list_display = ("seller", "date", "orders", "units", "revenue")
+    list_filter = ("date",)
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("name", "status", "attempts", "run_at", "started_at", "finished_at")
+    list_filter = ("status", "name")
+    readonly_fields = ("created_at", "started_at", "finished_at", "last_error")
+    actions = ["requeue"]
+
+    @admin.action(description="Requeue selected jobs")
+    def requeue(self, request, queryset):
+        updated = queryset.exclude(status=Job.STATUS_RUNNING).update(
+            status=Job.STATUS_QUEUED, run_at=timezone.now(), attempts=0, finished_at=None
+        )
+        self.message_user(request, f"Requeued {updated} jobs.")
+
+
+@admin.register(SlugHistory)
+class SlugHistoryAdmin(admin.ModelAdmin):
+    list_display = ("slug", "scope", "object_id", "created_at")
+    list_filter = ("scope",)
+    search_fields = ("slug",)
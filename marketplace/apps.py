@@ -6,4 +6,12 @@ class MarketplaceConfig(AppConfig):
     name = 'marketplace'
 
     def ready(self):
-        from . import signals  # noqa
\ No newline at end of file
+        from django.conf import settings
+
+        from . import signals, tasks  # noqa
+        from .instrumentation import install
+
+        # Hook connections from the start: the threads async views query from
+        # may open theirs before the metrics middleware is first built.
+        if settings.REQUEST_METRICS_ENABLED:
+            install()
@@ -0,0 +1,56 @@
+from inspect import isawaitable
+
+from asgiref.sync import sync_to_async
+from rest_framework import generics
+from rest_framework.response import Response
+
+
+class AsyncAPIView(generics.GenericAPIView):
+    """A DRF view whose handlers may be coroutines.
+
+    DRF's own ``dispatch`` is synchronous, so this one runs the synchronous
+    parts (authentication, permissions, throttling) in a thread and awaits
+    the handler. Django treats the view as async once every handler is.
+    """
+
+    async def dispatch(self, request, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            if request.method.lower() in self.http_method_names:
+                handler = getattr(self, request.method.lower(), self.http_method_not_allowed)
+            else:
+                handler = self.http_method_not_allowed
+            response = handler(request, *args, **kwargs)
+            if isawaitable(response):
+                response = await response
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+
+class AsyncListAPIView(AsyncAPIView):
+    """``ListAPIView`` that reads its page with the async ORM.
+
+    Override ``aload_page`` to fetch related rows for a page before it is
+    serialized.
+    """
+
+    async def aload_page(self, rows):
+        return rows
+
+    async def get(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        if self.paginator is not None:
+            page = await self.aload_page(await self.paginator.apaginate_queryset(queryset, request, view=self))
+            serializer = self.get_serializer(page, many=True)
+            return self.get_paginated_response(serializer.data)
+        serializer = self.get_serializer(await self.aload_page([obj async for obj in queryset]), many=True)
+        return Response(serializer.data)
@@ -0,0 +1,38 @@
+import statistics
+
+
+def latency_summary(latencies, elapsed):
+    """p50/p95/max latency (ms) and throughput for ``latencies`` measured over ``elapsed`` seconds."""
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {
+        "requests_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentiles[49], 1),
+        "p95_ms": round(percentiles[94], 1),
+        "max_ms": round(max(latencies), 1),
+    }
+
+
+def _percent_change(current, previous):
+    return f"{(current / previous - 1) * 100:+.1f}%" if previous else None
+
+
+def compare(results, baseline):
+    """Per-view change against an earlier run of the same benchmark.
+
+    Latency and throughput are relative changes; ``queries_per_request``
+    is the absolute difference, where any increase deserves a look.
+    """
+    changes = {}
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        changes[name] = {
+            metric: _percent_change(current[metric], previous[metric])
+            for metric in ("p50_ms", "p95_ms", "requests_per_second")
+        }
+        if "queries_per_request" in current and "queries_per_request" in previous:
+            changes[name]["queries_per_request"] = round(
+                current["queries_per_request"] - previous["queries_per_request"], 1
+            )
+    return changes
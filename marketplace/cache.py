@@ -0,0 +1,90 @@
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+CATEGORY_NAMESPACE = "categories"
+CATALOG_NAMESPACE = "catalog"
+PRODUCT_CARD_NAMESPACE = "product-cards"
+CACHE_TIMEOUT = 60 * 60
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def get_version(namespace):
+    key = f"{namespace}:version"
+    version = cache.get(key)
+    if version is None:
+        version = time.time_ns()
+        if not cache.add(key, version, None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_version(namespace):
+    """Invalidate every key stored under ``namespace`` in O(1)."""
+    key = f"{namespace}:version"
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, time.time_ns(), None)
+
+
+def versioned_key(namespace, *parts):
+    return ":".join([namespace, str(get_version(namespace)), *map(str, parts)])
+
+
+def get_or_set(namespace, name, default, timeout=CACHE_TIMEOUT):
+    return cache.get_or_set(versioned_key(namespace, name), default, timeout)
+
+
+def cached_categories():
+    """All categories, each annotated with ``product_count``, in one query."""
+    from .models import Category
+
+    return get_or_set(
+        CATEGORY_NAMESPACE,
+        "all",
+        lambda: list(Category.objects.annotate(product_count=Count("products"))),
+    )
+
+
+def record(name, hit):
+    with _stats_lock:
+        _stats[(name, "hits" if hit else "misses")] += 1
+
+
+def fragment_stats():
+    """Return ``{fragment: {"hits": n, "misses": n}}`` for this process."""
+    with _stats_lock:
+        snapshot = dict(_stats)
+    stats = {}
+    for (name, kind), count in snapshot.items():
+        stats.setdefault(name, {"hits": 0, "misses": 0})[kind] = count
+    return stats
+
+
+def reset_fragment_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def cached_fragment(name, key_parts, render, namespace=CATALOG_NAMESPACE, timeout=None):
+    """Return rendered HTML for ``name`` from the cache, rendering on a miss.
+
+    Keys embed the version of ``namespace``; the catalog namespace is bumped
+    by any Product, Category or Review change (see ``signals.py``).
+    """
+    if timeout is None:
+        timeout = getattr(settings, "FRAGMENT_CACHE_TIMEOUT", 300)
+    key = versioned_key(namespace, "fragment", name, *key_parts)
+    html = cache.get(key)
+    record(name, html is not None)
+    if html is None:
+        html = render()
+        cache.set(key, html, timeout)
+    return html
@@ -0,0 +1,137 @@
+from django.db import connections, router, transaction
+from django.db.models import Sum
+
+from .models import CartItem, Product
+
+CART_COUNT_SESSION_KEY = "cart_item_count"
+
+
+class UnknownProducts(Exception):
+    def __init__(self, product_ids):
+        self.product_ids = sorted(product_ids)
+        super().__init__(f"Unknown products: {self.product_ids}")
+
+
+def _tables(using):
+    quote = connections[using].ops.quote_name
+    return quote(CartItem._meta.db_table), quote(Product._meta.db_table)
+
+
+def add_item(cart, product):
+    """Add one unit of ``product`` to ``cart`` in a single upsert.
+
+    Inserts a new line or increments the existing one with
+    ``quantity = quantity + 1``, never past the product's current stock.
+    Returns the new quantity, or ``None`` if nothing could be added.
+    """
+    using = router.db_for_write(CartItem)
+    item_table, product_table = _tables(using)
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {item_table} (cart_id, product_id, quantity) "
+            f"SELECT %s, id, 1 FROM {product_table} WHERE id = %s AND stock > 0 "
+            f"ON CONFLICT (cart_id, product_id) DO UPDATE SET quantity = {item_table}.quantity + 1 "
+            f"WHERE {item_table}.quantity < (SELECT stock FROM {product_table} WHERE id = excluded.product_id) "
+            f"RETURNING quantity",
+            [cart.pk, product.pk],
+        )
+        row = cursor.fetchone()
+    return row[0] if row else None
+
+
+def set_item_quantity(cart, item_id, quantity):
+    """Set a cart line's quantity, capped at stock, in one UPDATE.
+
+    A line whose product has no stock left is deleted instead and ``0`` is
+    returned. Returns the stored quantity, or ``None`` if the line is not
+    in ``cart``.
+    """
+    using = router.db_for_write(CartItem)
+    item_table, product_table = _tables(using)
+    with transaction.atomic(using=using), connections[using].cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {item_table} SET quantity = ("
+            f"SELECT CASE WHEN stock < %s THEN stock ELSE %s END FROM {product_table} "
+            f"WHERE {product_table}.id = {item_table}.product_id"
+            f") WHERE id = %s AND cart_id = %s RETURNING quantity",
+            [quantity, quantity, item_id, cart.pk],
+        )
+        row = cursor.fetchone()
+        if row and row[0] == 0:
+            cursor.execute(f"DELETE FROM {item_table} WHERE id = %s", [item_id])
+    return row[0] if row else None
+
+
+def apply_quantities(cart, quantities):
+    """Set several cart lines at once from a ``{product_id: quantity}`` map.
+
+    Runs in one transaction with a fixed number of statements whatever the
+    batch size: one stock lookup, one DELETE for lines set to zero (or with
+    no stock left) and one bulk upsert for the rest. Quantities are capped
+    at stock; returns ``{product_id: stored_quantity}`` for every product.
+    The lookup locks the product rows (in id order, so concurrent batches
+    cannot deadlock) and stock cannot change under the cap until commit.
+    """
+    with transaction.atomic():
+        stock = dict(
+            Product.objects.select_for_update()
+            .filter(pk__in=quantities)
+            .order_by("pk")
+            .values_list("pk", "stock")
+        )
+        missing = set(quantities) - set(stock)
+        if missing:
+            raise UnknownProducts(missing)
+
+        stored = {product_id: min(quantity, stock[product_id]) for product_id, quantity in quantities.items()}
+        removed = [product_id for product_id, quantity in stored.items() if quantity <= 0]
+        if removed:
+            CartItem.objects.filter(cart=cart, product_id__in=removed).delete()
+        lines = [
+            CartItem(cart=cart, product_id=product_id, quantity=quantity)
+            for product_id, quantity in stored.items()
+            if quantity > 0
+        ]
+        if lines:
+            CartItem.objects.bulk_create(
+                lines,
+                update_conflicts=True,
+                unique_fields=["cart", "product"],
+                update_fields=["quantity"],
+            )
+    return stored
+
+
+def remove_item(cart, item_id):
+    deleted, _ = CartItem.objects.filter(pk=item_id, cart=cart).delete()
+    return bool(deleted)
+
+
+def count_cart_items(user):
+    return CartItem.objects.filter(cart__user=user).aggregate(total=Sum("quantity"))["total"] or 0
+
+
+def get_cart_item_count(request):
+    """Return the cart badge count, computing it at most once per session."""
+    count = request.session.get(CART_COUNT_SESSION_KEY)
+    if count is None:
+        count = refresh_cart_item_count(request)
+    return count
+
+
+def refresh_cart_item_count(request, count=None):
+    if count is None:
+        count = count_cart_items(request.user)
+    request.session[CART_COUNT_SESSION_KEY] = count
+    return count
+
+
+def adjust_cart_item_count(request, delta):
+    count = request.session.get(CART_COUNT_SESSION_KEY)
+    if count is not None:
+        request.session[CART_COUNT_SESSION_KEY] = count + delta
+
+
+def forget_cart_item_count(request):
+    """Drop the cached badge count so the next page render recounts it."""
+    request.session.pop(CART_COUNT_SESSION_KEY, None)
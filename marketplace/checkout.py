@@ -0,0 +1,84 @@
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Now
+
+from .jobs import enqueue
+from .models import CartItem, Order, OrderItem, Product
+
+
+class CheckoutError(Exception):
+    pass
+
+
+class EmptyCart(CheckoutError):
+    pass
+
+
+class InsufficientStock(CheckoutError):
+    def __init__(self, product):
+        self.product = product
+        super().__init__(f"Not enough stock for {product.name}.")
+
+
+def _reserve_stock(product, quantity):
+    """Decrement stock only if enough remains; returns False when it does not."""
+    updated = Product.objects.filter(pk=product.pk, stock__gte=quantity).update(
+        stock=F("stock") - quantity, updated_at=Now()
+    )
+    return bool(updated)
+
+
+def place_order(user, cart, full_name, shipping_address, contact_number, payment_method):
+    """Turn ``cart`` into an order in a single transaction.
+
+    Cart lines are re-read inside the transaction, stock is reserved with one
+    conditional UPDATE per product (in primary-key order, so concurrent
+    checkouts lock rows in the same order), order items are written with
+    ``bulk_create`` together with a snapshot of each product's name and
+    slug, the total is computed from the in-memory lines and a job is
+    queued to update the sellers' daily sales rollups. Reserving stock moves
+    each product's ``updated_at``, which re-keys its cached card and the
+    home sections that list it.
+    Raises ``InsufficientStock`` or ``EmptyCart`` and rolls everything back.
+    """
+    with transaction.atomic():
+        items = list(CartItem.objects.filter(cart=cart).select_related("product").order_by("product_id"))
+        if not items:
+            raise EmptyCart("Your cart is empty.")
+
+        for item in items:
+            if not _reserve_stock(item.product, item.quantity):
+                raise InsufficientStock(item.product)
+
+        payment_status = (
+            Order.PAYMENT_STATUS_PAID
+            if payment_method == Order.PAYMENT_METHOD_PICKUP
+            else Order.PAYMENT_STATUS_PENDING
+        )
+        order = Order.objects.create(
+            user=user,
+            full_name=full_name,
+            shipping_address=shipping_address,
+            contact_number=contact_number,
+            payment_method=payment_method,
+            payment_status=payment_status,
+            total=sum((item.subtotal for item in items), Decimal("0.00")),
+        )
+        OrderItem.objects.bulk_create(
+            [
+                OrderItem(
+                    order=order,
+                    product=item.product,
+                    product_name=item.product.name,
+                    product_slug=item.product.slug,
+                    quantity=item.quantity,
+                    price=item.product.price,
+                )
+                for item in items
+            ]
+        )
+        enqueue("rollups.record_order_sales", {"order_id": order.pk})
+        CartItem.objects.filter(pk__in=[item.pk for item in items]).delete()
+    return order
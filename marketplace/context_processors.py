@@ -1,16 +1,30 @@
-from .models import Cart, Category, UserProfile
+from django.utils.functional import SimpleLazyObject
+
+from .cache import cached_categories
+from .cart import get_cart_item_count
+from .models import UserProfile
+
+
+def _user_profile(user):
+    try:
+        return user.profile
+    except UserProfile.DoesNotExist:
+        return None
 
 
 def global_context(request):
-    categories = Category.objects.all()
-    cart_count = 0
-    profile = None
-    if request.user.is_authenticated:
-        cart, _ = Cart.objects.get_or_create(user=request.user)
-        cart_count = cart.total_items
-        try:
-            profile = request.user.profile
-        except UserProfile.DoesNotExist:
-            profile = None
-    return {"nav_categories": categories, "cart_item_count": cart_count, "user_profile": profile}
+    def cart_count():
+        if request.user.is_authenticated:
+            return get_cart_item_count(request)
+        return 0
+
+    def profile():
+        if request.user.is_authenticated:
+            return _user_profile(request.user)
+        return None
 
+    return {
+        "nav_categories": SimpleLazyObject(cached_categories),
+        "cart_item_count": SimpleLazyObject(cart_count),
+        "user_profile": SimpleLazyObject(profile),
+    }
@@ -0,0 +1,131 @@
+import random
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.urls import Resolver404, resolve
+
+PIN_COOKIE = "primary_reads"
+SAFE_METHODS = ("GET", "HEAD")
+# Only these models are read from a replica; sessions, users, carts and orders never are.
+CATALOG_MODELS = frozenset(
+    ["marketplace.category", "marketplace.product", "marketplace.review", "marketplace.slughistory"]
+)
+
+_current = ContextVar("db_routing", default=None)
+
+
+class RequestRouting:
+    """The replica (if any) the current request reads the catalog from."""
+
+    def __init__(self, replica=None):
+        self.replica = replica
+        self.wrote_catalog = False
+
+
+class ReplicaRouter:
+    """Send catalog reads of replica-eligible requests to a read replica.
+
+    Eligibility is decided per request by :class:`ReplicaRoutingMiddleware`;
+    outside such a request (commands, jobs, other views) every query goes to
+    the primary. Any write moves the rest of the request back to the primary,
+    as does an open transaction on it; only catalog writes pin the client.
+    """
+
+    def db_for_read(self, model, **hints):
+        state = _current.get()
+        if state is None or state.replica is None or model._meta.label_lower not in CATALOG_MODELS:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _current.get()
+        if state is not None:
+            state.replica = None
+            # Sessions, carts and orders are always read from the primary, so
+            # writing them (e.g. the session row on every authenticated
+            # request) needs no pin.
+            if model._meta.label_lower in CATALOG_MODELS:
+                state.wrote_catalog = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the primary's rows, so objects may mix freely.
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+
+def _url_name(request):
+    try:
+        return resolve(request.path_info, getattr(request, "urlconf", None)).url_name
+    except Resolver404:
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Mark safe requests to ``REPLICA_READ_VIEWS`` as readable from a replica.
+
+    One replica is picked per request. A request that writes a catalog model
+    sets the ``primary_reads`` cookie for ``REPLICA_PIN_SECONDS``, and the
+    client reads from the primary until it expires, so a user always sees
+    their own changes even while the replicas lag.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def _routing(self, request):
+        replica = None
+        if (
+            request.method in SAFE_METHODS
+            and PIN_COOKIE not in request.COOKIES
+            and _url_name(request) in settings.REPLICA_READ_VIEWS
+        ):
+            replica = random.choice(settings.DATABASE_REPLICAS)
+        return RequestRouting(replica)
+
+    def _finish(self, response, state):
+        if state.wrote_catalog:
+            response.set_cookie(
+                PIN_COOKIE,
+                "1",
+                max_age=settings.REPLICA_PIN_SECONDS,
+                secure=settings.SESSION_COOKIE_SECURE,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        state = self._routing(request)
+        token = _current.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(response, state)
+
+    async def __acall__(self, request):
+        state = self._routing(request)
+        token = _current.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(response, state)
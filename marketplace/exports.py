@@ -0,0 +1,120 @@
+import csv
+import json
+from itertools import islice
+
+from django.core.files.storage import default_storage
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+EXPORT_CHUNK_SIZE = 2000
+CONTENT_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+
+def _isoformat(value):
+    return value.isoformat()
+
+
+# (column, ``values()`` lookup, optional transform)
+PRODUCT_COLUMNS = [
+    ("id", "id", None),
+    ("name", "name", None),
+    ("slug", "slug", None),
+    ("description", "description", None),
+    ("price", "price", None),
+    ("stock", "stock", None),
+    ("is_featured", "is_featured", None),
+    ("category", "category__slug", None),
+    ("category_name", "category__name", None),
+    ("seller", "seller__username", None),
+    ("avg_rating", "avg_rating", None),
+    ("rating_count", "rating_count", None),
+    ("image", "image", lambda name: default_storage.url(name) if name else ""),
+    ("created_at", "created_at", _isoformat),
+    ("updated_at", "updated_at", _isoformat),
+]
+
+ORDER_LINE_COLUMNS = [
+    ("order", "order_id", None),
+    ("created_at", "order__created_at", _isoformat),
+    ("status", "order__status", None),
+    ("payment_method", "order__payment_method", None),
+    ("payment_status", "order__payment_status", None),
+    ("customer", "order__full_name", None),
+    ("product", "product_name", None),
+    ("product_slug", "product_slug", None),
+    ("seller", "product__seller__username", None),
+    ("quantity", "quantity", None),
+    ("price", "price", None),
+]
+
+
+class _Echo:
+    """File-like object whose ``write`` hands the CSV line straight back."""
+
+    def write(self, value):
+        return value
+
+
+class RowEncoder:
+    def __init__(self, columns, format):
+        self.columns = columns
+        self.headers = [column for column, _, _ in columns]
+        self.format = format
+        self.writer = csv.writer(_Echo())
+
+    def _values(self, row):
+        return [transform(row[lookup]) if transform else row[lookup] for _, lookup, transform in self.columns]
+
+    def header(self):
+        return self.writer.writerow(self.headers) if self.format == "csv" else ""
+
+    def encode(self, rows):
+        if self.format == "csv":
+            return "".join(self.writer.writerow(self._values(row)) for row in rows)
+        return "".join(
+            json.dumps(dict(zip(self.headers, self._values(row))), cls=DjangoJSONEncoder) + "\n" for row in rows
+        )
+
+
+def export_rows(queryset, columns):
+    """Narrow ``queryset`` to ``values()`` dicts of the export columns, in id order."""
+    return queryset.order_by("pk").values(*[lookup for _, lookup, _ in columns])
+
+
+def _stream(rows, encoder, chunk_size):
+    yield encoder.header()
+    iterator = rows.iterator(chunk_size=chunk_size)
+    while chunk := list(islice(iterator, chunk_size)):
+        yield encoder.encode(chunk)
+
+
+async def _astream(rows, encoder, chunk_size):
+    yield encoder.header()
+    chunk = []
+    async for row in rows.aiterator(chunk_size=chunk_size):
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            yield encoder.encode(chunk)
+            chunk = []
+    if chunk:
+        yield encoder.encode(chunk)
+
+
+def streaming_export(request, queryset, columns, format, filename, chunk_size=EXPORT_CHUNK_SIZE):
+    """Stream ``queryset`` as CSV or NDJSON without building it in memory.
+
+    Rows come from ``values()`` fetched ``chunk_size`` at a time. Under
+    ASGI the rows are read with an async iterator, because Django would
+    otherwise buffer a synchronous one in full before sending a byte.
+    """
+    rows = export_rows(queryset, columns)
+    encoder = RowEncoder(columns, format)
+    if isinstance(request, ASGIRequest):
+        content = _astream(rows, encoder, chunk_size)
+    else:
+        content = _stream(rows, encoder, chunk_size)
+    response = StreamingHttpResponse(content, content_type=CONTENT_TYPES[format])
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{format}"'
+    response["Cache-Control"] = "no-store"
+    return response
@@ -1,7 +1,9 @@
 from django import forms
 from django.contrib.auth import get_user_model
-from django.contrib.auth.forms import UserCreationForm
+from django.contrib.auth.forms import PasswordResetForm, UserCreationForm
+from django.template import loader
 
+from .jobs import enqueue
 from .models import Product, Review, UserProfile
 
 User = get_user_model()
@@ -30,6 +32,30 @@ class UserRegistrationForm(UserCreationForm):
         return user
 
 
+class QueuedPasswordResetForm(PasswordResetForm):
+    """Render the reset email in the request but hand delivery to the job queue."""
+
+    def send_mail(
+        self,
+        subject_template_name,
+        email_template_name,
+        context,
+        from_email,
+        to_email,
+        html_email_template_name=None,
+    ):
+        subject = "".join(loader.render_to_string(subject_template_name, context).splitlines())
+        payload = {
+            "subject": subject,
+            "body": loader.render_to_string(email_template_name, context),
+            "to": [to_email],
+            "from_email": from_email,
+        }
+        if html_email_template_name is not None:
+            payload["html_body"] = loader.render_to_string(html_email_template_name, context)
+        enqueue("mail.send", payload)
+
+
 class ProductForm(forms.ModelForm):
     class Meta:
         model = Product
@@ -43,6 +69,24 @@ class ProductForm(forms.ModelForm):
             "image": forms.FileInput(attrs={"class": "w-full p-2 border rounded-lg"}),
         }
 
+    def save(self, commit=True):
+        product = super().save(commit=commit)
+        if commit and "image" in self.changed_data:
+            enqueue("images.generate_product_derivatives", {"product_id": product.pk})
+        return product
+
+
+class ProductImportRowForm(forms.Form):
+    """Validates one row of a bulk product import (see ``marketplace.imports``)."""
+
+    name = forms.CharField(max_length=150)
+    description = forms.CharField(required=False)
+    price = forms.DecimalField(max_digits=10, decimal_places=2, min_value=0)
+    stock = forms.IntegerField(min_value=0, required=False)
+    category = forms.CharField(max_length=100)
+    is_featured = forms.BooleanField(required=False)
+    slug = forms.SlugField(max_length=180, required=False)
+
 
 class ReviewForm(forms.ModelForm):
     class Meta:
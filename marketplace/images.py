@@ -0,0 +1,69 @@
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db.models.functions import Now
+from PIL import Image, ImageOps
+
+from .cache import CATALOG_NAMESPACE, bump_version
+from .models import Product
+
+DEFAULT_WIDTHS = (320, 640, 960)
+FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+def derivative_widths():
+    return tuple(sorted(getattr(settings, "PRODUCT_IMAGE_WIDTHS", DEFAULT_WIDTHS)))
+
+
+def derivative_name(name, width, extension):
+    """``products/mango.png`` -> ``products/mango-320w.webp``, next to the original."""
+    stem, _ = os.path.splitext(name)
+    return f"{stem}-{width}w.{extension}"
+
+
+def generate_derivatives(field_file):
+    """Write resized WebP and JPEG copies of an image and return their widths.
+
+    Widths wider than the original are skipped; an image narrower than the
+    smallest configured width gets a single derivative at its own width.
+    """
+    storage = field_file.storage
+    with field_file.open("rb") as handle:
+        image = ImageOps.exif_transpose(Image.open(handle))
+        image.load()
+    if image.mode not in ("RGB", "L"):
+        image = image.convert("RGB")
+
+    widths = [width for width in derivative_widths() if width < image.width] or [image.width]
+    for width in widths:
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        for extension, (image_format, options) in FORMATS.items():
+            buffer = BytesIO()
+            resized.save(buffer, image_format, **options)
+            name = derivative_name(field_file.name, width, extension)
+            if storage.exists(name):
+                storage.delete(name)
+            storage.save(name, ContentFile(buffer.getvalue()))
+    return widths
+
+
+def generate_product_derivatives(product):
+    """Regenerate a product's derivatives and record which widths exist."""
+    widths = generate_derivatives(product.image) if product.image else []
+    Product.objects.filter(pk=product.pk).update(image_derivatives=widths, updated_at=Now())
+    product.image_derivatives = widths
+    bump_version(CATALOG_NAMESPACE)
+    return widths
+
+
+def srcset(field_file, widths, extension):
+    storage = field_file.storage
+    return ", ".join(
+        f"{storage.url(derivative_name(field_file.name, width, extension))} {width}w" for width in widths
+    )
@@ -0,0 +1,323 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import Counter, deque
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.backends.django import DjangoTemplates
+
+logger = logging.getLogger(__name__)
+
+UNRESOLVED_ROUTE = "<unresolved>"
+# Transaction control repeats by design and is never an N+1.
+TRANSACTION_STATEMENTS = ("BEGIN", "COMMIT", "ROLLBACK", "SAVEPOINT", "RELEASE")
+
+# Attributes every LogRecord has; anything else came from ``extra``.
+_RECORD_ATTRIBUTES = frozenset(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+_current = ContextVar("request_metrics", default=None)
+_routes = {}
+_totals = Counter()
+_repeated = {}
+_lock = threading.Lock()
+
+
+class RequestMetrics:
+    """Counters for the request being served, shared with any thread it uses."""
+
+    def __init__(self, debug=False):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.rendering = False
+        self.statements = Counter() if debug else None
+
+    def repeated_queries(self):
+        """``[(sql, count)]`` for statements run more than once with the same params."""
+        if not self.statements:
+            return []
+        return [(sql, count) for (sql, _), count in self.statements.most_common() if count > 1]
+
+
+def _execute_wrapper(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_time += time.perf_counter() - started
+        metrics.queries += 1
+        if metrics.statements is not None and not sql.lstrip().upper().startswith(TRANSACTION_STATEMENTS):
+            metrics.statements[(sql, repr(params))] += 1
+
+
+class TimedTemplate:
+    """A template from :class:`TimedDjangoTemplates` that adds its render time to the request."""
+
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        metrics = _current.get()
+        if metrics is None or metrics.rendering:
+            return self.template.render(context, request)
+        metrics.rendering = True
+        started, db_time = time.perf_counter(), metrics.db_time
+        try:
+            return self.template.render(context, request)
+        finally:
+            # Lazy querysets evaluated by the template are already counted as db time.
+            metrics.template_time += time.perf_counter() - started - (metrics.db_time - db_time)
+            metrics.rendering = False
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """The Django template backend, timing renders for :class:`RequestMetricsMiddleware`.
+
+    Only templates loaded through this engine are timed (``render``,
+    ``render_to_string``, DRF renderers); outside a measured request they
+    render exactly as before.
+    """
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+class KeyValueFormatter(logging.Formatter):
+    """Append a record's ``extra`` fields to the message as ``key=value`` pairs."""
+
+    def format(self, record):
+        message = super().format(record)
+        fields = " ".join(
+            f"{key}={self._value(value)}"
+            for key, value in record.__dict__.items()
+            if key not in _RECORD_ATTRIBUTES
+        )
+        return f"{message} {fields}" if fields else message
+
+    @staticmethod
+    def _value(value):
+        if isinstance(value, (int, float)) or value is None:
+            return json.dumps(value)
+        text = str(value)
+        return json.dumps(text) if not text or any(char in text for char in ' "=') else text
+
+
+def _install_wrapper(connection, **kwargs):
+    # First in the list, so ``connection.execute_wrapper()`` blocks that pop
+    # their own wrapper off the end never remove this one.
+    if _execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, _execute_wrapper)
+
+
+def install():
+    """Hook query timing into every connection.
+
+    Connections are per thread, so the wrapper is added whenever one is
+    opened; it reads the current request from a context variable, which
+    ``sync_to_async`` carries into the threads async views query from.
+    Template time comes from :class:`TimedDjangoTemplates`.
+    """
+    connection_created.connect(_install_wrapper, dispatch_uid="marketplace.instrumentation")
+    for connection in connections.all():
+        _install_wrapper(connection)
+
+
+def _route(request):
+    match = getattr(request, "resolver_match", None)
+    return match.view_name if match else UNRESOLVED_ROUTE
+
+
+def server_timing(metrics, total, repeated=()):
+    entries = [
+        f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+        f"tpl;dur={metrics.template_time * 1000:.1f}",
+        f"total;dur={total * 1000:.1f}",
+    ]
+    if repeated:
+        entries.append(f'dup;desc="{sum(count for _, count in repeated)} repeated queries"')
+    return ", ".join(entries)
+
+
+def record_request(route, sample, repeated=()):
+    with _lock:
+        samples = _routes.get(route)
+        if samples is None:
+            samples = _routes[route] = deque(maxlen=settings.REQUEST_METRICS_WINDOW)
+        samples.append(sample)
+        _totals[route] += 1
+        if repeated:
+            _repeated[route] = repeated[:5]
+
+
+def _percentile(values, fraction):
+    return values[min(len(values) - 1, round(fraction * (len(values) - 1)))]
+
+
+def _summarise(samples):
+    latencies = sorted(sample["total_ms"] for sample in samples)
+    sizes = [sample["bytes"] for sample in samples if sample["bytes"] is not None]
+    return {
+        "window": len(samples),
+        "p50_ms": _percentile(latencies, 0.5),
+        "p95_ms": _percentile(latencies, 0.95),
+        "max_ms": latencies[-1],
+        "avg_queries": round(sum(sample["queries"] for sample in samples) / len(samples), 1),
+        "max_queries": max(sample["queries"] for sample in samples),
+        "avg_db_ms": round(sum(sample["db_ms"] for sample in samples) / len(samples), 1),
+        "avg_template_ms": round(sum(sample["template_ms"] for sample in samples) / len(samples), 1),
+        "avg_bytes": round(sum(sizes) / len(sizes)) if sizes else None,
+        "requests_with_repeated_queries": sum(1 for sample in samples if sample["repeated_queries"]),
+    }
+
+
+def request_stats():
+    """Per-view latency, query and size summary over the last requests in this process.
+
+    Routes are ordered by p95 latency, slowest first. ``count`` covers every
+    request since the last reset; the other figures cover the rolling window
+    of ``REQUEST_METRICS_WINDOW`` requests.
+    """
+    with _lock:
+        snapshot = {route: list(samples) for route, samples in _routes.items()}
+        totals = dict(_totals)
+        repeated = dict(_repeated)
+    stats = {}
+    for route, samples in snapshot.items():
+        summary = {"count": totals[route], **_summarise(samples)}
+        if route in repeated:
+            summary["repeated_queries"] = [{"sql": sql, "count": count} for sql, count in repeated[route]]
+        stats[route] = summary
+    return dict(sorted(stats.items(), key=lambda item: item[1]["p95_ms"], reverse=True))
+
+
+def reset_request_stats():
+    with _lock:
+        _routes.clear()
+        _totals.clear()
+        _repeated.clear()
+
+
+def database_stats():
+    """Connection settings per database alias, with pool counters when pooled.
+
+    Pools live in each worker process, so ``pid`` says which worker answered;
+    the counters are psycopg's ``ConnectionPool.get_stats()``.
+    """
+    databases = {}
+    for alias in connections:
+        connection = connections[alias]
+        summary = {
+            "vendor": connection.vendor,
+            "conn_max_age": connection.settings_dict["CONN_MAX_AGE"],
+            "health_checks": connection.settings_dict["CONN_HEALTH_CHECKS"],
+            "pooled": False,
+        }
+        pool = connection.pool if connection.vendor == "postgresql" else None
+        if pool is not None:
+            summary["pooled"] = True
+            summary["pool"] = pool.get_stats()
+        databases[alias] = summary
+    return {"pid": os.getpid(), "databases": databases}
+
+
+def _finish(request, response, metrics):
+    total = time.perf_counter() - metrics.started
+    route = _route(request)
+    repeated = metrics.repeated_queries()
+    sample = {
+        "status": response.status_code,
+        "queries": metrics.queries,
+        "db_ms": round(metrics.db_time * 1000, 1),
+        "template_ms": round(metrics.template_time * 1000, 1),
+        "total_ms": round(total * 1000, 1),
+        "bytes": None if response.streaming else len(response.content),
+        "repeated_queries": sum(count for _, count in repeated),
+    }
+    existing = response.get("Server-Timing")
+    timing = server_timing(metrics, total, repeated)
+    response["Server-Timing"] = f"{existing}, {timing}" if existing else timing
+    record_request(route, sample, repeated)
+
+    logger.info(
+        "%s %s %s %s in %.1fms (%s queries, db %.1fms, tpl %.1fms, %s bytes)",
+        request.method,
+        request.path,
+        route,
+        sample["status"],
+        sample["total_ms"],
+        sample["queries"],
+        sample["db_ms"],
+        sample["template_ms"],
+        "streamed" if sample["bytes"] is None else sample["bytes"],
+        extra={"route": route, "method": request.method, "path": request.path, **sample},
+    )
+    for sql, count in repeated:
+        logger.warning(
+            "%s ran the same query %s times: %s",
+            route,
+            count,
+            sql,
+            extra={"route": route, "sql": sql, "count": count},
+        )
+
+
+class RequestMetricsMiddleware:
+    """Record query count, SQL time, template time and size for each request.
+
+    Adds a ``Server-Timing`` header, logs one line per request to
+    ``marketplace.instrumentation`` and feeds :func:`request_stats`. With
+    ``REQUEST_METRICS_DEBUG`` on, statements repeated with identical
+    parameters are logged as warnings. Queries a streaming response runs
+    after the view returns are not counted.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        install()
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        metrics = RequestMetrics(settings.REQUEST_METRICS_DEBUG)
+        token = _current.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        _finish(request, response, metrics)
+        return response
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics(settings.REQUEST_METRICS_DEBUG)
+        token = _current.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        _finish(request, response, metrics)
+        return response
@@ -0,0 +1,195 @@
+import logging
+import time
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Avg, Count, DurationField, ExpressionWrapper, F, Max, Q
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+TASKS = {}
+
+
+class UnknownTask(LookupError):
+    pass
+
+
+def task(name):
+    """Register a function as a job handler; its payload is passed as kwargs."""
+
+    def decorator(func):
+        TASKS[name] = func
+        return func
+
+    return decorator
+
+
+def retry_delay(attempts):
+    """Exponential backoff: ``JOBS_RETRY_DELAY * 2 ** (attempts - 1)`` seconds, capped."""
+    base = getattr(settings, "JOBS_RETRY_DELAY", 10)
+    cap = getattr(settings, "JOBS_RETRY_MAX_DELAY", 3600)
+    return timedelta(seconds=min(base * 2 ** max(attempts - 1, 0), cap))
+
+
+def enqueue(name, payload=None, delay=None, max_attempts=None):
+    """Queue the ``name`` task to run with ``payload``.
+
+    The job row is written in the caller's transaction, so workers only see
+    it once that commits. With ``JOBS_RUN_INLINE`` the job runs in-process
+    straight after the commit instead, which suits tests and development.
+    """
+    if name not in TASKS:
+        raise UnknownTask(name)
+    job = Job.objects.create(
+        name=name,
+        payload=payload or {},
+        run_at=timezone.now() + (delay or timedelta()),
+        max_attempts=max_attempts or getattr(settings, "JOBS_MAX_ATTEMPTS", 5),
+    )
+    if getattr(settings, "JOBS_RUN_INLINE", False):
+        transaction.on_commit(lambda: run_pending(job_ids=[job.pk]))
+    return job
+
+
+def claim_jobs(limit=10, job_ids=None):
+    """Mark up to ``limit`` due jobs as running and return them.
+
+    Rows are picked with ``SELECT ... FOR UPDATE SKIP LOCKED`` so concurrent
+    workers never claim the same job and never wait on each other. Backends
+    without row locks (SQLite) serialise the claim on the write lock instead.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        due = Job.objects.select_for_update(skip_locked=True).filter(status=Job.STATUS_QUEUED, run_at__lte=now)
+        if job_ids is not None:
+            due = due.filter(pk__in=job_ids)
+        ids = list(due.order_by("run_at", "id").values_list("pk", flat=True)[:limit])
+        if not ids:
+            return []
+        Job.objects.filter(pk__in=ids).update(
+            status=Job.STATUS_RUNNING, started_at=now, attempts=F("attempts") + 1
+        )
+    return list(Job.objects.filter(pk__in=ids))
+
+
+def run_job(job):
+    """Run one claimed job and record the outcome.
+
+    The handler runs in a transaction together with the update that marks
+    the job done, so a crash never leaves its writes half applied. Failures
+    are retried with backoff until ``max_attempts`` is reached.
+    """
+    started = time.monotonic()
+    try:
+        handler = TASKS.get(job.name)
+        if handler is None:
+            raise UnknownTask(job.name)
+        with transaction.atomic():
+            handler(**job.payload)
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.STATUS_DONE, finished_at=timezone.now(), last_error=""
+            )
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts < job.max_attempts:
+            job.status = Job.STATUS_QUEUED
+            Job.objects.filter(pk=job.pk).update(
+                status=job.status, run_at=timezone.now() + retry_delay(job.attempts), last_error=error
+            )
+        else:
+            job.status = Job.STATUS_FAILED
+            Job.objects.filter(pk=job.pk).update(
+                status=job.status, finished_at=timezone.now(), last_error=error
+            )
+    else:
+        job.status = Job.STATUS_DONE
+
+    run_ms = (time.monotonic() - started) * 1000
+    wait_ms = (job.started_at - job.run_at).total_seconds() * 1000
+    log = logger.info if job.status == Job.STATUS_DONE else logger.warning
+    log(
+        "job %s #%s %s after %.0fms (waited %.0fms, attempt %s/%s)",
+        job.name,
+        job.pk,
+        job.status,
+        run_ms,
+        wait_ms,
+        job.attempts,
+        job.max_attempts,
+        extra={
+            "job": job.name,
+            "job_id": job.pk,
+            "status": job.status,
+            "attempt": job.attempts,
+            "run_ms": round(run_ms, 1),
+            "wait_ms": round(wait_ms, 1),
+        },
+    )
+    return job.status
+
+
+def run_pending(limit=10, job_ids=None):
+    """Claim and run one batch of due jobs; returns how many ran."""
+    jobs = claim_jobs(limit, job_ids=job_ids)
+    for job in jobs:
+        run_job(job)
+    return len(jobs)
+
+
+def requeue_stale(timeout):
+    """Put jobs whose worker died mid-run back in the queue (or fail them)."""
+    cutoff = timezone.now() - timeout
+    stale = Job.objects.filter(status=Job.STATUS_RUNNING, started_at__lt=cutoff)
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.STATUS_FAILED, finished_at=timezone.now(), last_error="Worker stopped before finishing."
+    )
+    requeued = stale.update(status=Job.STATUS_QUEUED, run_at=timezone.now())
+    return requeued + failed
+
+
+def purge_finished(older_than):
+    deleted, _ = Job.objects.filter(
+        status__in=[Job.STATUS_DONE, Job.STATUS_FAILED], finished_at__lt=timezone.now() - older_than
+    ).delete()
+    return deleted
+
+
+def job_stats(since=None):
+    """Per-task counts and latency for jobs created since ``since``.
+
+    ``wait`` is the time a job sat due in the queue before a worker started
+    it and ``run`` is how long its last attempt took, both in seconds.
+    """
+    jobs = Job.objects.all()
+    if since is not None:
+        jobs = jobs.filter(created_at__gte=since)
+    wait = ExpressionWrapper(F("started_at") - F("run_at"), output_field=DurationField())
+    run = ExpressionWrapper(F("finished_at") - F("started_at"), output_field=DurationField())
+    done = Q(status=Job.STATUS_DONE)
+    rows = (
+        jobs.values("name")
+        .annotate(
+            queued=Count("pk", filter=Q(status=Job.STATUS_QUEUED)),
+            running=Count("pk", filter=Q(status=Job.STATUS_RUNNING)),
+            done=Count("pk", filter=done),
+            failed=Count("pk", filter=Q(status=Job.STATUS_FAILED)),
+            retried=Count("pk", filter=Q(attempts__gt=1)),
+            avg_wait=Avg(wait, filter=done),
+            max_wait=Max(wait, filter=done),
+            avg_run=Avg(run, filter=done),
+            max_run=Max(run, filter=done),
+        )
+        .order_by("name")
+    )
+    stats = {}
+    for row in rows:
+        name = row.pop("name")
+        for key in ("avg_wait", "max_wait", "avg_run", "max_run"):
+            row[key] = round(row[key].total_seconds(), 3) if row[key] is not None else None
+        stats[name] = row
+    return stats
@@ -0,0 +1,136 @@
+import json
+import os
+import subprocess
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.error import URLError
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from marketplace.benchmarks import latency_summary
+from marketplace.models import Product
+from marketplace.seed import is_test_database, seed_marketplace
+
+DEFAULT_PATHS = ["/", "/products/", "/products/?q=fresh", "/api/products/", "/api/categories/"]
+# Environment each --connections choice starts gunicorn with.
+CONNECTION_MODES = {
+    "fresh": {"DATABASE_POOL": "False", "DATABASE_CONN_MAX_AGE": "0"},
+    "persistent": {"DATABASE_POOL": "False", "DATABASE_CONN_MAX_AGE": "60"},
+    "pooled": {"DATABASE_POOL": "True"},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the catalog under sync WSGI and async ASGI gunicorn workers against the "
+        "configured database and print throughput and latency as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--modes", nargs="+", default=["wsgi", "asgi"], choices=["wsgi", "asgi"])
+        parser.add_argument("--workers", type=int, default=2, help="Gunicorn worker processes.")
+        parser.add_argument("--concurrency", type=int, default=32, help="Requests in flight at once.")
+        parser.add_argument("--requests", type=int, default=500, help="Requests per mode.")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--path", action="append", dest="paths", help="URL path to request (repeatable).")
+        parser.add_argument(
+            "--products", type=int, default=500, help="Seed the catalog up to this many products first."
+        )
+        parser.add_argument(
+            "--connections",
+            nargs="+",
+            choices=list(CONNECTION_MODES),
+            help=(
+                "Also compare database connection handling: a new connection per request, persistent "
+                "connections, or psycopg's pool (PostgreSQL only). Results are keyed mode/connections."
+            ),
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Allow seeding missing products into a database that is not a test database.",
+        )
+
+    def handle(self, *args, **options):
+        if "pooled" in (options["connections"] or ()) and connection.vendor != "postgresql":
+            raise CommandError("--connections pooled needs a PostgreSQL DATABASE_URL.")
+        self.ensure_fixture(options["products"], options["force"])
+        paths = options["paths"] or DEFAULT_PATHS
+        results = {}
+        for mode in options["modes"]:
+            if not options["connections"]:
+                results[mode] = self.benchmark(mode, paths, options)
+            for connections in options["connections"] or ():
+                results[f"{mode}/{connections}"] = self.benchmark(
+                    mode, paths, options, CONNECTION_MODES[connections]
+                )
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def ensure_fixture(self, count, force=False):
+        missing = count - Product.objects.count()
+        if missing <= 0:
+            return
+        if not force and not is_test_database():
+            raise CommandError(
+                f"The configured database needs {missing} more products for --products {count}. "
+                "Pass --force to seed them into it, or point DATABASE_URL at a test database."
+            )
+        seed_marketplace(products=missing, reviews=missing * 2, orders=missing // 2)
+
+    def benchmark(self, mode, paths, options, environment=None):
+        base_url = f"http://127.0.0.1:{options['port']}"
+        server = subprocess.Popen(
+            ["gunicorn", "--workers", str(options["workers"]), "--bind", f"127.0.0.1:{options['port']}"],
+            cwd=Path(settings.BASE_DIR).parent,
+            env={**os.environ, **(environment or {}), "WEB_SERVER_MODE": mode},
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        try:
+            self.wait_until_ready(base_url + paths[0])
+            for path in paths:
+                for _ in range(options["workers"] * 2):
+                    self.fetch(base_url + path)
+
+            urls = [base_url + paths[index % len(paths)] for index in range(options["requests"])]
+            started = time.perf_counter()
+            with ThreadPoolExecutor(options["concurrency"]) as pool:
+                samples = list(pool.map(self.fetch, urls))
+            elapsed = time.perf_counter() - started
+        finally:
+            server.terminate()
+            server.wait(timeout=30)
+
+        latencies = [latency for latency, ok in samples if ok]
+        if len(latencies) < 2:
+            raise CommandError(f"{mode}: too few successful requests to report.")
+        return {
+            "requests": len(samples),
+            "errors": len(samples) - len(latencies),
+            **latency_summary(latencies, elapsed),
+        }
+
+    def wait_until_ready(self, url, timeout=30):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            try:
+                urlopen(url, timeout=5).read()
+                return
+            except (URLError, ConnectionError):
+                time.sleep(0.2)
+        raise CommandError(f"Server did not answer {url} within {timeout}s.")
+
+    @staticmethod
+    def fetch(url):
+        started = time.perf_counter()
+        try:
+            with urlopen(url, timeout=30) as response:
+                response.read()
+                ok = response.status == 200
+        except (URLError, ConnectionError):
+            ok = False
+        return (time.perf_counter() - started) * 1000, ok
@@ -0,0 +1,136 @@
+import json
+import logging
+import time
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+from django.urls import reverse
+
+from marketplace.benchmarks import compare, latency_summary
+from marketplace.models import Cart, CartItem, Product
+from marketplace.seed import seed_marketplace
+
+CHECKOUT_FORM = {
+    "full_name": "Benchmark Buyer",
+    "shipping_address": "Benchmark farm road",
+    "contact_number": "0917 000 0000",
+    "payment_method": "cash",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database with seed_marketplace, drive the main views through the Django "
+        "test client and print p50/p95 latency, throughput and queries per request as JSON."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=50, help="Timed requests per view.")
+        parser.add_argument("--warmup", type=int, default=5, help="Untimed requests per view first.")
+        parser.add_argument("--view", action="append", dest="views", help="Only run this URL name (repeatable).")
+        parser.add_argument("--users", type=int, default=200)
+        parser.add_argument("--sellers", type=int, default=20)
+        parser.add_argument("--products", type=int, default=2000)
+        parser.add_argument("--reviews", type=int, default=5000)
+        parser.add_argument("--orders", type=int, default=1000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", help="Also write the results to this JSON file.")
+        parser.add_argument("--baseline", help="Compare against a JSON file written by an earlier run.")
+
+    def handle(self, *args, **options):
+        if options["requests"] < 2:
+            raise CommandError("--requests must be at least 2.")
+        baseline = json.loads(Path(options["baseline"]).read_text()) if options["baseline"] else None
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        request_log = logging.getLogger("marketplace.instrumentation")
+        log_level = request_log.level
+        request_log.setLevel(logging.WARNING)
+        try:
+            fixture = seed_marketplace(
+                users=options["users"],
+                sellers=options["sellers"],
+                products=options["products"],
+                reviews=options["reviews"],
+                orders=options["orders"],
+                seed=options["seed"],
+                tag="bench",
+            )
+            views = {}
+            for name, (request, prepare) in self.cases(fixture["tag"]).items():
+                if not options["views"] or name in options["views"]:
+                    views[name] = self.measure(request, prepare, options["requests"], options["warmup"])
+        finally:
+            request_log.setLevel(log_level)
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        results = {
+            "database": connection.vendor,
+            "fixture": fixture,
+            "requests_per_view": options["requests"],
+            "views": views,
+        }
+        if baseline is not None:
+            results["changes"] = compare(views, baseline["views"])
+        output = json.dumps(results, indent=2)
+        if options["output"]:
+            Path(options["output"]).write_text(output + "\n")
+        self.stdout.write(output)
+
+    def cases(self, tag):
+        """URL name -> ``(request, prepare)``; ``prepare`` (untimed) resets any state the request consumes."""
+        User = get_user_model()
+        anonymous, buyer, seller = Client(), Client(), Client()
+        buyer_user = User.objects.get(username=f"{tag}-buyer-0")
+        buyer.force_login(buyer_user)
+        seller.force_login(User.objects.get(username=f"{tag}-seller-0"))
+        cart, _ = Cart.objects.get_or_create(user=buyer_user)
+        product = Product.objects.order_by("-rating_count", "pk").first()
+        products_url, detail_url = reverse("product_list"), reverse("product_detail", args=[product.slug])
+
+        def fill_cart():
+            CartItem.objects.get_or_create(cart=cart, product=product)
+
+        return {
+            "home": (lambda: anonymous.get(reverse("home")), None),
+            "product_list": (lambda: anonymous.get(products_url), None),
+            "product_list_search": (lambda: anonymous.get(products_url, {"q": "fresh"}), None),
+            "product_detail": (lambda: anonymous.get(detail_url), None),
+            "add_to_cart": (lambda: buyer.post(reverse("add_to_cart", args=[product.slug])), None),
+            "view_cart": (lambda: buyer.get(reverse("view_cart")), None),
+            "checkout": (lambda: buyer.post(reverse("checkout"), CHECKOUT_FORM), fill_cart),
+            "order_list": (lambda: buyer.get(reverse("order_list")), None),
+            "seller_dashboard": (lambda: seller.get(reverse("seller_dashboard")), None),
+            "api_products": (lambda: anonymous.get(reverse("api_products")), None),
+            "api_categories": (lambda: anonymous.get(reverse("api_categories")), None),
+            "api_orders": (lambda: buyer.get(reverse("api_orders")), None),
+            "api_cart": (lambda: buyer.get(reverse("api_cart")), None),
+        }
+
+    def measure(self, request, prepare, requests, warmup):
+        for _ in range(warmup):
+            if prepare:
+                prepare()
+            request()
+        latencies, queries, errors = [], 0, 0
+        for _ in range(requests):
+            if prepare:
+                prepare()
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = request()
+                latencies.append((time.perf_counter() - started) * 1000)
+            queries += len(captured)
+            errors += response.status_code >= 400
+        return {
+            "requests": requests,
+            "errors": errors,
+            **latency_summary(latencies, sum(latencies) / 1000),
+            "queries_per_request": round(queries / requests, 1),
+        }
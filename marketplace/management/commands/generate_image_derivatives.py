@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+
+from marketplace.images import generate_product_derivatives
+from marketplace.jobs import enqueue
+from marketplace.models import Product
+
+
+class Command(BaseCommand):
+    help = "Generate resized WebP and JPEG copies of product images."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force", action="store_true", help="Regenerate products that already have derivatives."
+        )
+        parser.add_argument(
+            "--queue", action="store_true", help="Queue one job per product for the workers instead."
+        )
+
+    def handle(self, *args, **options):
+        products = (
+            Product.objects.exclude(image="")
+            .exclude(image__isnull=True)
+            .only("id", "image", "image_derivatives")
+        )
+        if not options["force"]:
+            products = products.filter(image_derivatives=[])
+        if options["queue"]:
+            queued = 0
+            for product_id in products.order_by("id").values_list("id", flat=True).iterator(chunk_size=200):
+                enqueue("images.generate_product_derivatives", {"product_id": product_id})
+                queued += 1
+            self.stdout.write(self.style.SUCCESS(f"Queued derivatives for {queued} products."))
+            return
+        generated = failed = 0
+        for product in products.order_by("id").iterator(chunk_size=200):
+            try:
+                generate_product_derivatives(product)
+            except (OSError, ValueError) as exc:
+                failed += 1
+                self.stderr.write(f"Product {product.pk}: {exc}")
+            else:
+                generated += 1
+        self.stdout.write(self.style.SUCCESS(f"Generated derivatives for {generated} products ({failed} failed)."))
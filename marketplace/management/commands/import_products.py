@@ -0,0 +1,53 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from marketplace.imports import (
+    IMPORT_BATCH_SIZE,
+    IMPORT_FORMATS,
+    ImportFormatError,
+    format_for_filename,
+    import_products,
+)
+
+
+class Command(BaseCommand):
+    help = "Create or update a seller's products from a CSV or NDJSON file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--seller", required=True, help="Username of the selling account.")
+        parser.add_argument("--format", choices=IMPORT_FORMATS, help="Defaults to the file extension.")
+        parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+        parser.add_argument("--dry-run", action="store_true", help="Validate without writing anything.")
+
+    def handle(self, *args, **options):
+        try:
+            seller = get_user_model().objects.get(username=options["seller"])
+        except get_user_model().DoesNotExist:
+            raise CommandError(f"No user named {options['seller']}.")
+
+        started = time.perf_counter()
+        try:
+            format = options["format"] or format_for_filename(options["path"])
+            with open(options["path"], encoding="utf-8-sig", newline="") as stream:
+                report = import_products(
+                    seller, stream, format, batch_size=options["batch_size"], dry_run=options["dry_run"]
+                )
+        except (ImportFormatError, OSError) as exc:
+            raise CommandError(str(exc))
+        elapsed = time.perf_counter() - started
+
+        for error in report.errors:
+            messages = "; ".join(
+                f"{field}: {detail['message']}" for field, details in error["errors"].items() for detail in details
+            )
+            self.stderr.write(f"Line {error['line']}: {messages}")
+        verb = "Would create" if options["dry_run"] else "Created"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{verb} {report.created} and updated {report.updated} products "
+                f"({len(report.errors)} rows rejected) in {elapsed:.2f}s."
+            )
+        )
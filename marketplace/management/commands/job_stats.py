@@ -0,0 +1,18 @@
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from marketplace.jobs import job_stats
+
+
+class Command(BaseCommand):
+    help = "Print per-task job counts and queue/run latency (seconds) as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--hours", type=int, default=24, help="Only include jobs created this recently.")
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(hours=options["hours"])
+        self.stdout.write(json.dumps(job_stats(since), indent=2))
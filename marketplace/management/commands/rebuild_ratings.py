@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from marketplace.models import Product
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored rating count and average for every product."
+
+    def handle(self, *args, **options):
+        updated = Product.objects.refresh_ratings()
+        self.stdout.write(self.style.SUCCESS(f"Updated ratings for {updated} products."))
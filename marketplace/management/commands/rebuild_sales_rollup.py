@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.dateparse import parse_date
+
+from marketplace.rollups import rebuild_seller_daily_sales
+
+
+class Command(BaseCommand):
+    help = "Backfill the per-seller daily sales rollup from existing order items."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", help="First day to rebuild (YYYY-MM-DD).")
+        parser.add_argument("--end", help="Last day to rebuild (YYYY-MM-DD).")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        dates = {}
+        for name in ("start", "end"):
+            value = options[name]
+            if value:
+                dates[name] = parse_date(value)
+                if dates[name] is None:
+                    raise CommandError(f"Invalid --{name} date: {value}")
+        created = rebuild_seller_daily_sales(batch_size=options["batch_size"], **dates)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {created} seller daily sales rows."))
@@ -0,0 +1,48 @@
+import signal
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from marketplace.jobs import purge_finished, requeue_stale, run_pending
+
+
+class Command(BaseCommand):
+    help = "Run queued background jobs until stopped (or until the queue is empty with --once)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10, help="Jobs claimed per poll.")
+        parser.add_argument("--sleep", type=float, default=1.0, help="Seconds to wait when the queue is empty.")
+        parser.add_argument("--once", action="store_true", help="Exit once no jobs are due.")
+        parser.add_argument(
+            "--stale-after", type=int, default=600, help="Requeue jobs left running this many seconds."
+        )
+        parser.add_argument("--keep-days", type=int, default=7, help="Days to keep finished jobs.")
+
+    def handle(self, *args, **options):
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        stale_after = timedelta(seconds=options["stale_after"])
+        keep = timedelta(days=options["keep_days"])
+        processed = 0
+        last_cleanup = 0.0
+
+        while not self.stopping:
+            close_old_connections()
+            if time.monotonic() - last_cleanup > 60:
+                requeue_stale(stale_after)
+                purge_finished(keep)
+                last_cleanup = time.monotonic()
+            ran = run_pending(options["batch_size"])
+            processed += ran
+            if not ran:
+                if options["once"]:
+                    break
+                time.sleep(options["sleep"])
+
+        self.stdout.write(self.style.SUCCESS(f"Processed {processed} jobs."))
+
+    def stop(self, signum, frame):
+        self.stopping = True
@@ -0,0 +1,48 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from marketplace.seed import SEED_PASSWORD, is_test_database, seed_marketplace
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic marketplace (buyers, sellers, categories, products, reviews, carts and "
+        f"orders) with bulk inserts. Seeded accounts use the password {SEED_PASSWORD!r}."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=200, help="Buyer accounts.")
+        parser.add_argument("--sellers", type=int, default=20, help="Seller accounts.")
+        parser.add_argument("--categories", type=int, default=12)
+        parser.add_argument("--products", type=int, default=2000)
+        parser.add_argument("--reviews", type=int, default=5000)
+        parser.add_argument("--carts", type=int, default=100, help="Buyers with a non-empty cart.")
+        parser.add_argument("--orders", type=int, default=1000)
+        parser.add_argument("--max-lines", type=int, default=4, help="Most lines per cart or order.")
+        parser.add_argument("--days", type=int, default=90, help="Spread orders over this many days.")
+        parser.add_argument("--seed", type=int, default=0, help="Random seed for a reproducible catalog.")
+        parser.add_argument("--tag", help="Username and slug prefix (random by default).")
+        parser.add_argument(
+            "--force", action="store_true", help="Seed even though the database is not a test database."
+        )
+
+    def handle(self, *args, **options):
+        if not options["force"] and not is_test_database():
+            raise CommandError(
+                "Refusing to add synthetic data to a database that is not a test database; pass --force."
+            )
+        counts = seed_marketplace(
+            users=options["users"],
+            sellers=options["sellers"],
+            categories=options["categories"],
+            products=options["products"],
+            reviews=options["reviews"],
+            carts=options["carts"],
+            orders=options["orders"],
+            max_lines=options["max_lines"],
+            days=options["days"],
+            seed=options["seed"],
+            tag=options["tag"],
+        )
+        self.stdout.write(json.dumps(counts, indent=2))
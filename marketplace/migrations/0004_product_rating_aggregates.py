@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-18 03:27
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce, Round
+
+
+def populate_ratings(apps, schema_editor):
+    Product = apps.get_model('marketplace', 'Product')
+    Review = apps.get_model('marketplace', 'Review')
+    reviews = Review.objects.filter(product=models.OuterRef('pk')).order_by().values('product')
+    Product.objects.update(
+        rating_count=Coalesce(models.Subquery(reviews.annotate(count=models.Count('pk')).values('count')), 0),
+        avg_rating=Coalesce(
+            models.Subquery(reviews.annotate(avg=Round(models.Avg('rating'), 2)).values('avg')),
+            0,
+            output_field=models.DecimalField(max_digits=3, decimal_places=2),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('marketplace', '0003_order_payment_method_order_payment_status'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='avg_rating',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=3),
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_ratings, migrations.RunPython.noop),
+    ]
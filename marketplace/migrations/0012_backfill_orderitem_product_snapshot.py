@@ -0,0 +1,37 @@
+from django.db import migrations, models, transaction
+
+BATCH_SIZE = 5000
+
+
+def backfill_product_snapshot(apps, schema_editor):
+    """Copy product name and slug onto existing order items, one id range per transaction.
+
+    Lines whose product was already deleted keep an empty snapshot.
+    """
+    OrderItem = apps.get_model('marketplace', 'OrderItem')
+    Product = apps.get_model('marketplace', 'Product')
+    using = schema_editor.connection.alias
+    product = Product.objects.using(using).filter(pk=models.OuterRef('product_id'))
+    pending = OrderItem.objects.using(using).filter(product__isnull=False, product_name='')
+    bounds = pending.aggregate(first=models.Min('pk'), last=models.Max('pk'))
+    if bounds['first'] is None:
+        return
+    for start in range(bounds['first'], bounds['last'] + 1, BATCH_SIZE):
+        with transaction.atomic(using=using):
+            pending.filter(pk__gte=start, pk__lt=start + BATCH_SIZE).update(
+                product_name=models.Subquery(product.values('name')[:1]),
+                product_slug=models.Subquery(product.values('slug')[:1]),
+            )
+
+
+class Migration(migrations.Migration):
+    # Each batch commits on its own so a large backfill never holds one long transaction.
+    atomic = False
+
+    dependencies = [
+        ('marketplace', '0011_orderitem_product_snapshot'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_product_snapshot, migrations.RunPython.noop),
+    ]
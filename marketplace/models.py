@@ -3,7 +3,11 @@ from decimal import Decimal
 from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
-from django.utils.text import slugify
+from django.db.models.functions import Coalesce, Now, Round
+from django.utils import timezone
+from django.utils.functional import cached_property
+
+from .slugs import allocate_slug, record_slug_change
 
 
 class UserProfile(models.Model):
@@ -16,7 +20,23 @@ class UserProfile(models.Model):
         return f"{self.user.username} profile"
 
 
-class Category(models.Model):
+class SlugHistoryMixin:
+    """Remembers the slug an instance was loaded with so renames leave a redirect."""
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_slug = instance.__dict__.get("slug")
+        return instance
+
+    def _record_slug_change(self):
+        old_slug = getattr(self, "_loaded_slug", None)
+        if old_slug and old_slug != self.slug:
+            record_slug_change(self, old_slug)
+        self._loaded_slug = self.slug
+
+
+class Category(SlugHistoryMixin, models.Model):
     name = models.CharField(max_length=100, unique=True)
     slug = models.SlugField(max_length=120, unique=True, blank=True)
     description = models.TextField(blank=True)
@@ -30,11 +50,42 @@ class Category(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = slugify(self.name)
+            self.slug = allocate_slug(Category, self.name)
         super().save(*args, **kwargs)
-
-
-class Product(models.Model):
+        self._record_slug_change()
+
+
+class ProductQuerySet(models.QuerySet):
+    def refresh_ratings(self):
+        """Recompute the stored rating aggregates with a single UPDATE.
+
+        Only products whose count or average actually changed are written, so
+        ``updated_at`` (part of the product card cache key) stays put for the
+        rest. Returns the number of products updated.
+        """
+        reviews = Review.objects.filter(product=models.OuterRef("pk")).order_by().values("product")
+        return (
+            self.annotate(
+                new_rating_count=Coalesce(
+                    models.Subquery(reviews.annotate(count=models.Count("pk")).values("count")),
+                    0,
+                ),
+                new_avg_rating=Coalesce(
+                    models.Subquery(reviews.annotate(avg=Round(models.Avg("rating"), 2)).values("avg")),
+                    0,
+                    output_field=models.DecimalField(max_digits=3, decimal_places=2),
+                ),
+            )
+            .exclude(rating_count=models.F("new_rating_count"), avg_rating=models.F("new_avg_rating"))
+            .update(
+                updated_at=Now(),
+                rating_count=models.F("new_rating_count"),
+                avg_rating=models.F("new_avg_rating"),
+            )
+        )
+
+
+class Product(SlugHistoryMixin, models.Model):
     category = models.ForeignKey(Category, on_delete=models.CASCADE, related_name="products")
     seller = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="products")
     name = models.CharField(max_length=150)
@@ -43,24 +94,64 @@ class Product(models.Model):
     price = models.DecimalField(max_digits=10, decimal_places=2)
     stock = models.PositiveIntegerField(default=0)
     image = models.ImageField(upload_to="products/", blank=True, null=True)
+    image_derivatives = models.JSONField(default=list, blank=True, editable=False)
     is_featured = models.BooleanField(default=False)
+    avg_rating = models.DecimalField(max_digits=3, decimal_places=2, default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ProductQuerySet.as_manager()
+
     class Meta:
-        ordering = ["-created_at"]
+        ordering = ["-created_at", "-id"]
+        indexes = [
+            models.Index(fields=["-created_at", "-id"], name="product_created_id_idx"),
+            # Home page: newest featured products.
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=models.Q(is_featured=True),
+                name="product_featured_created_idx",
+            ),
+            # Catalog browsing: one category, newest first, optionally in stock or priced.
+            models.Index(fields=["category", "-created_at", "-id"], name="product_category_created_idx"),
+            models.Index(fields=["category", "price"], name="product_category_price_idx"),
+            models.Index(
+                fields=["-created_at", "-id"],
+                condition=models.Q(stock__gt=0),
+                name="product_in_stock_created_idx",
+            ),
+        ]
 
     def __str__(self) -> str:
         return self.name
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        if "image" in instance.__dict__:
+            instance._loaded_image = instance.__dict__["image"] or ""
+        return instance
+
+    def _image_replaced(self):
+        loaded = getattr(self, "_loaded_image", None)
+        if loaded is None:
+            return False
+        return (self.image.name or "") != loaded or (bool(self.image) and not self.image._committed)
+
     def save(self, *args, **kwargs):
         if not self.slug:
-            self.slug = slugify(f"{self.name}-{self.seller_id or ''}")
+            self.slug = allocate_slug(Product, f"{self.name}-{self.seller_id or ''}")
+        if self._image_replaced():
+            # The old derivatives are named after the old file; until new
+            # ones are generated the image renders as a plain <img>.
+            self.image_derivatives = []
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "image_derivatives"}
         super().save(*args, **kwargs)
-
-    @property
-    def avg_rating(self):
-        return self.reviews.aggregate(models.Avg("rating"))["rating__avg"] or 0
+        self._record_slug_change()
+        if "image" in self.__dict__:
+            self._loaded_image = self.image.name or ""
 
 
 class Cart(models.Model):
@@ -71,20 +162,42 @@ class Cart(models.Model):
     class Meta:
         ordering = ["-updated_at"]
         constraints = [models.UniqueConstraint(fields=["user"], name="unique_cart_user")]
+        indexes = [models.Index(fields=["-updated_at"], name="cart_updated_idx")]
 
     def __str__(self):
         return f"Cart #{self.pk} for {self.user}"
 
+    def summary(self, items=None):
+        """Return ``{"total_items", "total_price"}`` for the cart.
+
+        Pass an already-loaded item list to total it without a query;
+        otherwise both values come from a single aggregate.
+        """
+        if items is not None:
+            return {
+                "total_items": sum(item.quantity for item in items),
+                "total_price": sum((item.subtotal for item in items), Decimal("0.00")),
+            }
+        return self.items.aggregate(
+            total_items=Coalesce(models.Sum("quantity"), 0),
+            total_price=Coalesce(
+                models.Sum(models.F("quantity") * models.F("product__price")),
+                Decimal("0.00"),
+                output_field=models.DecimalField(max_digits=12, decimal_places=2),
+            ),
+        )
+
+    @cached_property
+    def _summary(self):
+        return self.summary()
+
     @property
     def total_items(self):
-        return sum(item.quantity for item in self.items.select_related("product"))
+        return self._summary["total_items"]
 
     @property
     def total_price(self):
-        total = Decimal("0.00")
-        for item in self.items.select_related("product"):
-            total += item.subtotal
-        return total
+        return self._summary["total_price"]
 
 
 class CartItem(models.Model):
@@ -148,27 +261,35 @@ class Order(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
-        ordering = ["-created_at"]
+        ordering = ["-created_at", "-id"]
+        indexes = [models.Index(fields=["user", "-created_at", "-id"], name="order_user_created_id_idx")]
 
     def __str__(self):
         return f"Order #{self.pk}"
 
     def recalculate_total(self):
-        total = Decimal("0.00")
-        for item in self.items.select_related("product"):
-            total += item.subtotal
-        self.total = total
+        self.total = self.items.aggregate(
+            total=Coalesce(
+                models.Sum(models.F("price") * models.F("quantity")),
+                Decimal("0.00"),
+                output_field=models.DecimalField(max_digits=10, decimal_places=2),
+            )
+        )["total"]
         self.save(update_fields=["total"])
 
 
 class OrderItem(models.Model):
     order = models.ForeignKey(Order, on_delete=models.CASCADE, related_name="items")
     product = models.ForeignKey(Product, on_delete=models.SET_NULL, null=True)
+    # Snapshot taken at checkout, so history reads never join Product and
+    # survive the product being renamed or deleted.
+    product_name = models.CharField(max_length=150, blank=True)
+    product_slug = models.SlugField(max_length=180, blank=True, db_index=False)
     quantity = models.PositiveIntegerField(default=1)
     price = models.DecimalField(max_digits=10, decimal_places=2)
 
     def __str__(self):
-        return f"{self.product} x {self.quantity}"
+        return f"{self.product_name or self.product} x {self.quantity}"
 
     @property
     def subtotal(self):
@@ -185,6 +306,92 @@ class Review(models.Model):
     class Meta:
         ordering = ["-created_at"]
         unique_together = ("product", "user")
+        indexes = [models.Index(fields=["product", "-created_at"], name="review_product_created_idx")]
 
     def __str__(self):
         return f"{self.product} review by {self.user}"
+
+
+class SellerDailySales(models.Model):
+    """Per-seller sales totals for one day, maintained at checkout.
+
+    Revenue only counts the seller's own lines (``OrderItem.price *
+    quantity``), so mixed-seller orders are split correctly.
+    """
+
+    seller = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="daily_sales")
+    date = models.DateField()
+    orders = models.PositiveIntegerField(default=0)
+    units = models.PositiveIntegerField(default=0)
+    revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        ordering = ["-date"]
+        constraints = [models.UniqueConstraint(fields=["seller", "date"], name="unique_seller_daily_sales")]
+        verbose_name_plural = "seller daily sales"
+
+    def __str__(self):
+        return f"{self.seller} sales on {self.date}"
+
+
+class Job(models.Model):
+    """A unit of background work claimed by ``manage.py run_jobs`` workers."""
+
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_DONE = "done"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_DONE, "Done"),
+        (STATUS_FAILED, "Failed"),
+    ]
+
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=5)
+    run_at = models.DateTimeField(default=timezone.now)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["run_at", "id"]
+        indexes = [models.Index(fields=["status", "run_at"], name="job_status_run_at_idx")]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+
+class SlugSequence(models.Model):
+    """Highest numeric suffix handed out per slug base (see ``marketplace.slugs``)."""
+
+    scope = models.CharField(max_length=100)
+    base = models.CharField(max_length=200)
+    last_suffix = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["scope", "base"], name="unique_slug_sequence")]
+
+    def __str__(self):
+        return f"{self.scope}:{self.base} ({self.last_suffix})"
+
+
+class SlugHistory(models.Model):
+    """A retired slug and the object it used to identify, for redirects."""
+
+    scope = models.CharField(max_length=100)
+    slug = models.SlugField(max_length=200, db_index=False)
+    object_id = models.PositiveBigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["scope", "slug"], name="unique_slug_history")]
+        verbose_name_plural = "slug history"
+
+    def __str__(self):
+        return f"{self.scope}:{self.slug} -> {self.object_id}"
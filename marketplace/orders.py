@@ -0,0 +1,42 @@
+from .models import Order, OrderItem
+
+ORDER_FIELDS = ("id", "status", "payment_method", "payment_status", "total", "created_at")
+ORDER_ITEM_FIELDS = ("order_id", "product_name", "product_slug", "quantity", "price")
+STATUS_LABELS = dict(Order.STATUS_CHOICES)
+
+
+def order_history(user):
+    """``user``'s orders as ``values()`` dicts, for keyset pagination.
+
+    Pair a page of rows with :func:`attach_items`; neither query touches
+    ``Product``, because order items carry a snapshot of its name and slug.
+    """
+    return Order.objects.filter(user=user).values(*ORDER_FIELDS)
+
+
+def _items(orders):
+    return (
+        OrderItem.objects.filter(order_id__in=[order["id"] for order in orders])
+        .order_by("order_id", "id")
+        .values(*ORDER_ITEM_FIELDS)
+    )
+
+
+def _attach(orders, items):
+    by_id = {}
+    for order in orders:
+        order["status_display"] = STATUS_LABELS.get(order["status"], order["status"])
+        order["items"] = by_id[order["id"]] = []
+    for item in items:
+        item["subtotal"] = item["price"] * item["quantity"]
+        by_id[item.pop("order_id")].append(item)
+    return orders
+
+
+def attach_items(orders):
+    """Give each order dict its ``items`` and ``status_display`` with one query."""
+    return _attach(orders, list(_items(orders)))
+
+
+async def aattach_items(orders):
+    return _attach(orders, [item async for item in _items(orders)])
@@ -0,0 +1,254 @@
+import base64
+import json
+from functools import cached_property
+from types import SimpleNamespace
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+APPROXIMATE_COUNT_THRESHOLD = 1000
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def approximate_count(queryset, threshold=APPROXIMATE_COUNT_THRESHOLD):
+    """Return ``(count, is_exact)`` without scanning large result sets.
+
+    PostgreSQL answers from the planner's row estimate once it exceeds
+    ``threshold``; everywhere else the count is capped at ``threshold``.
+    """
+    queryset = queryset.order_by()
+    connection = connections[queryset.db]
+    if connection.vendor == "postgresql":
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        estimate = int(plan[0]["Plan"]["Plan Rows"])
+        if estimate > threshold:
+            return estimate, False
+        return queryset.count(), True
+    count = queryset[: threshold + 1].count()
+    if count > threshold:
+        return threshold, False
+    return count, True
+
+
+class KeysetPage:
+    def __init__(self, paginator, object_list, next_cursor, previous_cursor):
+        self.paginator = paginator
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    @cached_property
+    def approximate_count(self):
+        return approximate_count(self.paginator.queryset)
+
+    async def aload_count(self):
+        """Compute the count up front so async views never touch it lazily."""
+        self.__dict__["approximate_count"] = await sync_to_async(approximate_count)(self.paginator.queryset)
+        return self.approximate_count
+
+    @property
+    def count(self):
+        return self.approximate_count[0]
+
+    @property
+    def count_is_exact(self):
+        return self.approximate_count[1]
+
+
+class KeysetPaginator:
+    """Paginate a queryset by seeking past the last row of the previous page.
+
+    ``ordering`` must end in a unique column (normally ``id``) so that every
+    row has a distinct position; the filter then uses the matching composite
+    index and page N costs the same as page 1. Annotations such as a search
+    rank may lead the ordering.
+    """
+
+    def __init__(self, queryset, ordering=("-created_at", "-id"), per_page=24):
+        self.queryset = queryset
+        self.ordering = tuple(ordering)
+        self.per_page = per_page
+        self.fields = [self._resolve_field(name.lstrip("-")) for name in self.ordering]
+
+    def _resolve_field(self, name):
+        try:
+            return self.queryset.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            return self.queryset.query.annotations[name].output_field
+
+    def _position(self, obj):
+        # Rows are model instances, or dicts when the queryset uses ``values()``.
+        if isinstance(obj, dict):
+            obj = SimpleNamespace(**obj)
+        position = []
+        for name, field in zip(self.ordering, self.fields):
+            if getattr(field, "model", None) is None or not hasattr(obj, field.attname):
+                position.append(str(getattr(obj, name.lstrip("-"))))
+            else:
+                position.append(field.value_to_string(obj))
+        return position
+
+    def encode_cursor(self, obj, reverse=False):
+        position = self._position(obj)
+        payload = json.dumps({"p": position, "r": int(reverse)}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, cursor):
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            position = payload["p"]
+            if len(position) != len(self.fields):
+                raise ValueError
+            values = [field.to_python(value) for field, value in zip(self.fields, position)]
+            return values, bool(payload.get("r"))
+        except Exception as exc:
+            raise InvalidCursor("Invalid page cursor.") from exc
+
+    def _seek_filter(self, values, reverse):
+        condition = Q()
+        equal = Q()
+        for name, value in zip(self.ordering, values):
+            descending = name.startswith("-")
+            field = name.lstrip("-")
+            lookup = "lt" if descending != reverse else "gt"
+            condition |= equal & Q(**{f"{field}__{lookup}": value})
+            equal &= Q(**{field: value})
+        return condition
+
+    def _page_queryset(self, cursor):
+        queryset = self.queryset
+        reverse = False
+        if cursor:
+            values, reverse = self.decode_cursor(cursor)
+            queryset = queryset.filter(self._seek_filter(values, reverse))
+
+        ordering = self.ordering
+        if reverse:
+            ordering = tuple(name[1:] if name.startswith("-") else f"-{name}" for name in ordering)
+        return queryset.order_by(*ordering)[: self.per_page + 1], reverse
+
+    def page(self, cursor=None):
+        queryset, reverse = self._page_queryset(cursor)
+        return self._build_page(list(queryset), cursor, reverse)
+
+    async def apage(self, cursor=None):
+        queryset, reverse = self._page_queryset(cursor)
+        return self._build_page([row async for row in queryset], cursor, reverse)
+
+    def _build_page(self, rows, cursor, reverse):
+        has_more = len(rows) > self.per_page
+        rows = rows[: self.per_page]
+        if reverse:
+            rows.reverse()
+
+        next_cursor = previous_cursor = None
+        if rows:
+            if has_more or reverse:
+                next_cursor = self.encode_cursor(rows[-1])
+            if (has_more and reverse) or (cursor and not reverse):
+                previous_cursor = self.encode_cursor(rows[0], reverse=True)
+        return KeysetPage(self, rows, next_cursor, previous_cursor)
+
+
+class KeysetPagination(BasePagination):
+    """DRF pagination backed by :class:`KeysetPaginator`.
+
+    Views may set ``ordering`` to a tuple ending in a unique field; the
+    default matches ``Product.Meta.ordering``.
+    """
+
+    ordering = ("-created_at", "-id")
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def get_page_size(self, request):
+        page_size = api_settings.PAGE_SIZE or 24
+        try:
+            requested = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return page_size
+        return max(1, min(requested, self.max_page_size))
+
+    def _paginator(self, queryset, request, view):
+        self.request = request
+        ordering = getattr(view, "ordering", None) or self.ordering
+        return KeysetPaginator(queryset, ordering, self.get_page_size(request))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        paginator = self._paginator(queryset, request, view)
+        try:
+            self.page = paginator.page(request.query_params.get(self.cursor_query_param))
+        except InvalidCursor as exc:
+            raise ValidationError({self.cursor_query_param: [str(exc)]})
+        return list(self.page)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        paginator = self._paginator(queryset, request, view)
+        try:
+            self.page = await paginator.apage(request.query_params.get(self.cursor_query_param))
+        except InvalidCursor as exc:
+            raise ValidationError({self.cursor_query_param: [str(exc)]})
+        await self.page.aload_count()
+        return list(self.page)
+
+    def _link(self, cursor):
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": self.page.count,
+                "count_is_exact": self.page.count_is_exact,
+                "next": self._link(self.page.next_cursor),
+                "previous": self._link(self.page.previous_cursor),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "count": {"type": "integer"},
+                "count_is_exact": {"type": "boolean"},
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
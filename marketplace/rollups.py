@@ -0,0 +1,123 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connections, router, transaction
+from django.db.models import Count, DecimalField, F, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+
+from .models import OrderItem, SellerDailySales
+
+
+def record_order_sales(order, items):
+    """Add one order's lines to the sellers' daily rollups.
+
+    ``items`` are the order's ``OrderItem`` rows with ``product`` loaded.
+    Every seller in the order is upserted in a single statement.
+    """
+    day = timezone.localdate(order.created_at)
+    per_seller = defaultdict(lambda: [0, Decimal("0.00")])
+    for item in items:
+        if item.product is None:
+            continue
+        totals = per_seller[item.product.seller_id]
+        totals[0] += item.quantity
+        totals[1] += item.price * item.quantity
+    if not per_seller:
+        return
+
+    using = router.db_for_write(SellerDailySales)
+    table = connections[using].ops.quote_name(SellerDailySales._meta.db_table)
+    rows = ", ".join(["(%s, %s, 1, %s, %s)"] * len(per_seller))
+    params = []
+    for seller_id, (units, revenue) in sorted(per_seller.items()):
+        params.extend([seller_id, day, units, revenue])
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {table} (seller_id, date, orders, units, revenue) VALUES {rows} "
+            f"ON CONFLICT (seller_id, date) DO UPDATE SET "
+            f"orders = {table}.orders + excluded.orders, "
+            f"units = {table}.units + excluded.units, "
+            f"revenue = {table}.revenue + excluded.revenue",
+            params,
+        )
+
+
+def rebuild_seller_daily_sales(start=None, end=None, batch_size=1000, sellers=None):
+    """Recompute the rollup from order items, optionally for a date range or some sellers."""
+    items = OrderItem.objects.filter(product__isnull=False)
+    rollups = SellerDailySales.objects.all()
+    if sellers is not None:
+        items = items.filter(product__seller__in=sellers)
+        rollups = rollups.filter(seller__in=sellers)
+    if start:
+        items = items.filter(order__created_at__date__gte=start)
+        rollups = rollups.filter(date__gte=start)
+    if end:
+        items = items.filter(order__created_at__date__lte=end)
+        rollups = rollups.filter(date__lte=end)
+
+    rows = (
+        items.annotate(day=TruncDate("order__created_at"))
+        .values("product__seller", "day")
+        .annotate(
+            order_count=Count("order", distinct=True),
+            unit_count=Sum("quantity"),
+            revenue_total=Sum(F("price") * F("quantity")),
+        )
+        .order_by()
+    )
+    with transaction.atomic():
+        rollups.delete()
+        created = SellerDailySales.objects.bulk_create(
+            (
+                SellerDailySales(
+                    seller_id=row["product__seller"],
+                    date=row["day"],
+                    orders=row["order_count"],
+                    units=row["unit_count"],
+                    revenue=row["revenue_total"],
+                )
+                for row in rows.iterator()
+            ),
+            batch_size=batch_size,
+        )
+    return len(created)
+
+
+def seller_sales_summary(seller, start=None, end=None):
+    rollups = SellerDailySales.objects.filter(seller=seller)
+    if start:
+        rollups = rollups.filter(date__gte=start)
+    if end:
+        rollups = rollups.filter(date__lte=end)
+    return rollups.aggregate(
+        total_orders=Coalesce(Sum("orders"), 0),
+        total_units=Coalesce(Sum("units"), 0),
+        total_revenue=Coalesce(
+            Sum("revenue"), Decimal("0.00"), output_field=DecimalField(max_digits=12, decimal_places=2)
+        ),
+    )
+
+
+def seller_daily_series(seller, start, end):
+    """Return one ``{date, orders, units, revenue}`` dict per day in range."""
+    rows = {
+        row.date: row
+        for row in SellerDailySales.objects.filter(seller=seller, date__range=(start, end))
+    }
+    series = []
+    day = start
+    while day <= end:
+        row = rows.get(day)
+        series.append(
+            {
+                "date": day,
+                "orders": row.orders if row else 0,
+                "units": row.units if row else 0,
+                "revenue": row.revenue if row else Decimal("0.00"),
+            }
+        )
+        day += timedelta(days=1)
+    return series
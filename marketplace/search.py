@@ -0,0 +1,182 @@
+import re
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import F, FloatField, Func, Q, Value
+from django.db.models.expressions import Col, Expression, RawSQL
+from django.utils.module_loading import import_string
+
+SEARCH_ORDERING = ("-search_rank", "-created_at", "-id")
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+class BaseSearchBackend:
+    """Ranked product search.
+
+    ``search`` filters a ``Product`` queryset and annotates it with a
+    ``search_rank`` float where higher is more relevant; ``index`` and
+    ``remove`` keep the backend's storage in step with the product table.
+    """
+
+    def __init__(self, using="default"):
+        self.using = using
+
+    def search(self, queryset, query):
+        raise NotImplementedError
+
+    def index(self, product):
+        pass
+
+    def remove(self, product):
+        pass
+
+    def index_many(self, product_ids):
+        """(Re)index a batch of products, e.g. after ``bulk_create``."""
+
+    def rebuild(self):
+        pass
+
+    def _table(self):
+        from .models import Product
+
+        return connections[self.using].ops.quote_name(Product._meta.db_table)
+
+
+class SimpleSearchBackend(BaseSearchBackend):
+    """Unindexed ``icontains`` fallback for databases without full-text search."""
+
+    def search(self, queryset, query):
+        return queryset.filter(Q(name__icontains=query) | Q(description__icontains=query)).annotate(
+            search_rank=Value(0.0, output_field=FloatField())
+        )
+
+
+class TableColumn(Expression):
+    """A column of the queried model's table that is not a model field.
+
+    Resolves to a ``Col`` on the query's base table alias, so it keeps
+    working when the table is aliased, e.g. inside a subquery.
+    """
+
+    def __init__(self, column, output_field):
+        super().__init__(output_field=output_field)
+        self.column = column
+
+    def resolve_expression(self, query=None, allow_joins=True, reuse=None, summarize=False, for_save=False):
+        target = self.output_field.clone()
+        target.set_attributes_from_name(self.column)
+        return Col(query.get_initial_alias(), target, self.output_field)
+
+
+class PostgresSearchBackend(BaseSearchBackend):
+    """``tsvector`` column with a GIN index, ordered by ``ts_rank``.
+
+    Product names are weighted above descriptions. Migration
+    ``0006_product_search_index`` creates the column as a generated column,
+    so PostgreSQL keeps it current on every write and there is nothing to
+    index from Python.
+    """
+
+    config = "english"
+
+    def search(self, queryset, query):
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+
+        search_query = SearchQuery(query, config=self.config, search_type="websearch")
+        return (
+            queryset.alias(search_vector=TableColumn("search_vector", SearchVectorField()))
+            .filter(search_vector=search_query)
+            .annotate(search_rank=SearchRank(F("search_vector"), search_query))
+        )
+
+
+class FTS5Rank(Func):
+    """``-bm25()`` of a product's row in an FTS5 table, higher is more relevant."""
+
+    output_field = FloatField()
+
+    def __init__(self, fts_table, expression):
+        super().__init__(Value(expression), F("pk"))
+        self.fts_table = fts_table
+
+    def as_sql(self, compiler, connection, **extra_context):
+        match, pk = self.get_source_expressions()
+        match_sql, match_params = compiler.compile(match)
+        pk_sql, pk_params = compiler.compile(pk)
+        fts = self.fts_table
+        sql = f"(SELECT -bm25({fts}, 10.0, 1.0) FROM {fts} WHERE {fts} MATCH {match_sql} AND {fts}.rowid = {pk_sql})"
+        return sql, (*match_params, *pk_params)
+
+
+class SQLiteSearchBackend(BaseSearchBackend):
+    """FTS5 virtual table keyed by product id, ordered by ``bm25``.
+
+    Intended for local development; the table is created by migration
+    ``0006_product_search_index``.
+    """
+
+    fts_table = "marketplace_product_fts"
+
+    @staticmethod
+    def match_expression(query):
+        tokens = _TOKEN_RE.findall(query)
+        return " ".join(f'"{token}"*' for token in tokens)
+
+    def search(self, queryset, query):
+        expression = self.match_expression(query)
+        if not expression:
+            return queryset.annotate(search_rank=Value(0.0, output_field=FloatField())).none()
+        fts = self.fts_table
+        return queryset.annotate(search_rank=FTS5Rank(fts, expression)).filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", [expression])
+        )
+
+    def index(self, product):
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.fts_table} WHERE rowid = %s", [product.pk])
+            cursor.execute(
+                f"INSERT INTO {self.fts_table} (rowid, name, description) VALUES (%s, %s, %s)",
+                [product.pk, product.name, product.description],
+            )
+
+    def remove(self, product):
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.fts_table} WHERE rowid = %s", [product.pk])
+
+    def index_many(self, product_ids):
+        product_ids = list(product_ids)
+        placeholders = ", ".join(["%s"] * len(product_ids))
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.fts_table} WHERE rowid IN ({placeholders})", product_ids)
+            cursor.execute(
+                f"INSERT INTO {self.fts_table} (rowid, name, description) "
+                f"SELECT id, name, description FROM {self._table()} WHERE id IN ({placeholders})",
+                product_ids,
+            )
+
+    def rebuild(self):
+        with connections[self.using].cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.fts_table}")
+            cursor.execute(
+                f"INSERT INTO {self.fts_table} (rowid, name, description) "
+                f"SELECT id, name, description FROM {self._table()}"
+            )
+
+
+VENDOR_BACKENDS = {
+    "postgresql": PostgresSearchBackend,
+    "sqlite": SQLiteSearchBackend,
+}
+
+
+def get_search_backend(using="default"):
+    backend_path = getattr(settings, "SEARCH_BACKEND", None)
+    if backend_path:
+        return import_string(backend_path)(using)
+    backend_class = VENDOR_BACKENDS.get(connections[using].vendor, SimpleSearchBackend)
+    return backend_class(using)
+
+
+def search_products(queryset, query):
+    return get_search_backend(queryset.db).search(queryset, query)
@@ -0,0 +1,229 @@
+import random
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+from django.utils.text import slugify
+
+from .cache import CATALOG_NAMESPACE, CATEGORY_NAMESPACE, PRODUCT_CARD_NAMESPACE, bump_version
+from .models import Cart, CartItem, Category, Order, OrderItem, Product, Review, UserProfile
+from .rollups import rebuild_seller_daily_sales
+from .search import get_search_backend
+
+SEED_BATCH_SIZE = 1000
+SEED_PASSWORD = "harvest-seed"
+SEED_STOCK = 1_000_000
+CATEGORY_NAMES = [
+    "Vegetables",
+    "Fruit",
+    "Herbs",
+    "Grains",
+    "Dairy",
+    "Eggs",
+    "Honey",
+    "Mushrooms",
+    "Nuts",
+    "Flowers",
+    "Seedlings",
+    "Preserves",
+]
+PRODUCE = [
+    "Tomatoes",
+    "Carrots",
+    "Mangoes",
+    "Spinach",
+    "Basil",
+    "Brown rice",
+    "Goat cheese",
+    "Free-range eggs",
+    "Wildflower honey",
+    "Oyster mushrooms",
+    "Cashews",
+    "Sunflowers",
+    "Chili seedlings",
+    "Calamansi jam",
+    "Eggplant",
+    "Okra",
+    "Bananas",
+    "Lemongrass",
+    "Sweet corn",
+    "Ginger",
+    "Squash",
+    "Pineapples",
+]
+ADJECTIVES = ["Fresh", "Organic", "Heirloom", "Sun-ripened", "Hand-picked", "Local", "Small-batch", "Farm"]
+COMMENTS = ["Lovely quality.", "Arrived fresh.", "Would buy again.", "A bit small this time.", ""]
+
+
+def _categories(count):
+    names = [
+        CATEGORY_NAMES[index % len(CATEGORY_NAMES)]
+        + (f" {index // len(CATEGORY_NAMES) + 1}" if index >= len(CATEGORY_NAMES) else "")
+        for index in range(count)
+    ]
+    categories = [Category(name=name, slug=slugify(name)) for name in names]
+    Category.objects.bulk_create(categories, ignore_conflicts=True)
+    return list(Category.objects.filter(name__in=names))
+
+
+def _users(tag, role, count, password):
+    User = get_user_model()
+    users = User.objects.bulk_create(
+        [
+            User(username=f"{tag}-{role}-{index}", email=f"{tag}-{role}-{index}@example.com", password=password)
+            for index in range(count)
+        ],
+        batch_size=SEED_BATCH_SIZE,
+    )
+    UserProfile.objects.bulk_create(
+        [UserProfile(user=user, is_seller=role == "seller") for user in users], batch_size=SEED_BATCH_SIZE
+    )
+    return users
+
+
+def is_test_database(using=DEFAULT_DB_ALIAS):
+    """Whether ``using`` points at a throwaway test database rather than real data."""
+    connection = connections[using]
+    if connection.vendor == "sqlite" and connection.is_in_memory_db():
+        return True
+    name = str(connection.settings_dict["NAME"])
+    test_name = connection.settings_dict.get("TEST", {}).get("NAME")
+    return (test_name is not None and name == str(test_name)) or Path(name).name.startswith("test_")
+
+
+def seed_marketplace(
+    users=200,
+    sellers=20,
+    categories=12,
+    products=2000,
+    reviews=5000,
+    carts=100,
+    orders=1000,
+    max_lines=4,
+    days=90,
+    seed=0,
+    tag=None,
+):
+    """Fill the database with a synthetic marketplace using ``bulk_create``.
+
+    ``users`` buyers and ``sellers`` sellers are created with usernames
+    ``<tag>-buyer-N``/``<tag>-seller-N`` and the password ``SEED_PASSWORD``;
+    ``tag`` defaults to a random one so the generator can run repeatedly.
+    Orders are spread over the last ``days`` days and each order or cart has
+    up to ``max_lines`` lines. ``seed`` makes the catalog reproducible.
+    Ratings, the sales rollup and the search index are then rebuilt for the
+    seeded products and sellers only, leaving existing rows alone, and the
+    catalog caches invalidated. Returns the number of rows created per model.
+    """
+    rng = random.Random(seed)
+    tag = tag or f"seed-{uuid.uuid4().hex[:6]}"
+    password = make_password(SEED_PASSWORD)
+    now = timezone.now()
+
+    with transaction.atomic():
+        category_rows = _categories(categories)
+        seller_rows = _users(tag, "seller", sellers, password)
+        buyer_rows = _users(tag, "buyer", users, password)
+
+        catalog = []
+        for index in range(products if seller_rows and category_rows else 0):
+            name = f"{rng.choice(ADJECTIVES)} {rng.choice(PRODUCE)}"
+            catalog.append(
+                Product(
+                    category=rng.choice(category_rows),
+                    seller=seller_rows[index % len(seller_rows)],
+                    name=name,
+                    slug=f"{slugify(name)}-{tag}-{index}",
+                    description=f"{name}, picked and packed this week.",
+                    price=Decimal(rng.randint(50, 5000)) / 100,
+                    stock=SEED_STOCK,
+                    is_featured=rng.random() < 0.05,
+                )
+            )
+        catalog = Product.objects.bulk_create(catalog, batch_size=SEED_BATCH_SIZE)
+
+        # Review ``index`` goes to product ``index % P``; each product's reviewers are distinct.
+        review_count = min(reviews, len(catalog) * len(buyer_rows))
+        Review.objects.bulk_create(
+            (
+                Review(
+                    product=catalog[index % len(catalog)],
+                    user=buyer_rows[(index % len(catalog) + index // len(catalog)) % len(buyer_rows)],
+                    rating=rng.choices([1, 2, 3, 4, 5], weights=[1, 1, 3, 6, 9])[0],
+                    comment=rng.choice(COMMENTS),
+                )
+                for index in range(review_count)
+            ),
+            batch_size=SEED_BATCH_SIZE,
+        )
+
+        cart_rows = Cart.objects.bulk_create([Cart(user=user) for user in buyer_rows[:carts]])
+        CartItem.objects.bulk_create(
+            (
+                CartItem(cart=cart, product=product, quantity=rng.randint(1, 3))
+                for cart in cart_rows
+                if catalog
+                for product in rng.sample(catalog, min(len(catalog), rng.randint(1, max_lines)))
+            ),
+            batch_size=SEED_BATCH_SIZE,
+        )
+
+        order_rows, line_rows = [], []
+        for _ in range(orders if buyer_rows and catalog else 0):
+            buyer = rng.choice(buyer_rows)
+            lines = [
+                OrderItem(
+                    product=product,
+                    product_name=product.name,
+                    product_slug=product.slug,
+                    quantity=rng.randint(1, 3),
+                    price=product.price,
+                )
+                for product in rng.sample(catalog, min(len(catalog), rng.randint(1, max_lines)))
+            ]
+            order = Order(
+                user=buyer,
+                full_name=buyer.username,
+                shipping_address="Seeded farm road",
+                contact_number="0917 000 0000",
+                status=rng.choice([choice for choice, _ in Order.STATUS_CHOICES]),
+                payment_method=rng.choice([choice for choice, _ in Order.PAYMENT_METHOD_CHOICES]),
+                total=sum((line.subtotal for line in lines), Decimal("0.00")),
+            )
+            order_rows.append(order)
+            line_rows.append(lines)
+        order_rows = Order.objects.bulk_create(order_rows, batch_size=SEED_BATCH_SIZE)
+        # ``auto_now_add`` stamps bulk-created rows with now; spread them afterwards.
+        for order in order_rows:
+            order.created_at = now - timedelta(seconds=rng.randint(0, days * 24 * 60 * 60))
+        Order.objects.bulk_update(order_rows, ["created_at"], batch_size=SEED_BATCH_SIZE)
+        for order, lines in zip(order_rows, line_rows):
+            for line in lines:
+                line.order = order
+        OrderItem.objects.bulk_create([line for lines in line_rows for line in lines], batch_size=SEED_BATCH_SIZE)
+
+        # Seeded orders only contain seeded products, which only seeded sellers own.
+        Product.objects.filter(seller__in=seller_rows).refresh_ratings()
+        rebuild_seller_daily_sales(sellers=seller_rows)
+        search = get_search_backend(Product.objects.db)
+        for start in range(0, len(catalog), SEED_BATCH_SIZE):
+            search.index_many([product.pk for product in catalog[start : start + SEED_BATCH_SIZE]])
+
+    for namespace in (CATALOG_NAMESPACE, CATEGORY_NAMESPACE, PRODUCT_CARD_NAMESPACE):
+        bump_version(namespace)
+    return {
+        "tag": tag,
+        "categories": len(category_rows),
+        "sellers": len(seller_rows),
+        "buyers": len(buyer_rows),
+        "products": len(catalog),
+        "reviews": review_count,
+        "carts": len(cart_rows),
+        "orders": len(order_rows),
+        "order_lines": sum(len(lines) for lines in line_rows),
+    }
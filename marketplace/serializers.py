@@ -1,6 +1,6 @@
 from rest_framework import serializers
 
-from .models import Category, Order, OrderItem, Product
+from .models import CartItem, Category, Order, OrderItem, Product
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -32,11 +32,9 @@ class ProductSerializer(serializers.ModelSerializer):
 
 
 class OrderItemSerializer(serializers.ModelSerializer):
-    product_name = serializers.CharField(source="product.name", read_only=True)
-
     class Meta:
         model = OrderItem
-        fields = ("product_name", "quantity", "price")
+        fields = ("product_name", "product_slug", "quantity", "price")
 
 
 class OrderSerializer(serializers.ModelSerializer):
@@ -46,3 +44,22 @@ class OrderSerializer(serializers.ModelSerializer):
         model = Order
         fields = ("id", "status", "total", "created_at", "items")
 
+
+class CartItemSerializer(serializers.ModelSerializer):
+    name = serializers.CharField(source="product.name", read_only=True)
+    slug = serializers.CharField(source="product.slug", read_only=True)
+    price = serializers.DecimalField(source="product.price", max_digits=10, decimal_places=2, read_only=True)
+    subtotal = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = CartItem
+        fields = ("id", "product", "name", "slug", "price", "quantity", "subtotal")
+
+
+class CartLineUpdateSerializer(serializers.Serializer):
+    product = serializers.IntegerField(min_value=1)
+    quantity = serializers.IntegerField(min_value=0)
+
+
+class CartUpdateSerializer(serializers.Serializer):
+    items = CartLineUpdateSerializer(many=True, allow_empty=False, max_length=200)
@@ -1,8 +1,11 @@
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from .models import UserProfile
+from .cache import CATALOG_NAMESPACE, CATEGORY_NAMESPACE, PRODUCT_CARD_NAMESPACE, bump_version
+from .models import Category, Product, Review, UserProfile
+from .search import get_search_backend
 
 User = get_user_model()
 
@@ -18,3 +21,71 @@ def save_user_profile(sender, instance, **kwargs):
     if hasattr(instance, "profile"):
         instance.profile.save()
 
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_category_cache(sender, **kwargs):
+    # Product changes move the per-category product counts.
+    bump_version(CATEGORY_NAMESPACE)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_product_cards(sender, **kwargs):
+    bump_version(PRODUCT_CARD_NAMESPACE)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Review)
+def invalidate_catalog_fragments(sender, **kwargs):
+    bump_version(CATALOG_NAMESPACE)
+
+
+@receiver(post_save, sender=Review)
+def refresh_product_rating(sender, instance, **kwargs):
+    Product.objects.filter(pk=instance.product_id).refresh_ratings()
+
+
+@receiver(post_delete, sender=Review)
+def refresh_product_rating_after_delete(sender, instance, origin=None, **kwargs):
+    """Refresh the rating, and the catalog fragments, once a review is gone.
+
+    Deleting one review refreshes right away. Reviews deleted as part of a
+    larger delete (a queryset, or a cascade from a user or category) are
+    collected on the delete's ``origin`` and refreshed with one UPDATE when
+    the transaction commits. Cascades from Product are skipped: those
+    products are being deleted as well.
+    """
+    if origin is None or origin is instance:
+        Product.objects.filter(pk=instance.product_id).refresh_ratings()
+        bump_version(CATALOG_NAMESPACE)
+        return
+    if isinstance(origin, Product) or getattr(origin, "model", None) is Product:
+        return
+    product_ids = getattr(origin, "_rating_refresh_ids", None)
+    if product_ids is None:
+        product_ids = origin._rating_refresh_ids = set()
+
+        def refresh():
+            Product.objects.filter(pk__in=product_ids).refresh_ratings()
+            bump_version(CATALOG_NAMESPACE)
+
+        transaction.on_commit(refresh, using=instance._state.db)
+    product_ids.add(instance.product_id)
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and not {"name", "description"} & set(update_fields):
+        return
+    get_search_backend(instance._state.db).index(instance)
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, **kwargs):
+    get_search_backend(instance._state.db).remove(instance)
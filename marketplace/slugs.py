@@ -0,0 +1,120 @@
+from collections import Counter, defaultdict
+
+from django.db import connections, router
+from django.db.models import Q, Subquery
+from django.utils.text import slugify
+
+SUFFIX_ROOM = 11  # "-" plus up to ten digits
+
+
+def slug_scope(model):
+    return model._meta.label_lower
+
+
+def slug_base(model, text, field="slug"):
+    """Slugify ``text`` and trim it so a numeric suffix still fits the field."""
+    max_length = model._meta.get_field(field).max_length
+    return slugify(text)[: max_length - SUFFIX_ROOM].strip("-") or model._meta.model_name
+
+
+def _suffix(slug, base):
+    if slug == base:
+        return 1
+    rest = slug[len(base) + 1 :]
+    return int(rest) if rest.isdigit() else 0
+
+
+def _taken_suffixes(model, bases, field):
+    """Highest suffix already used for each base, from one indexed range query.
+
+    ``base`` itself counts as suffix 1 and ``base-N`` as N. The range
+    ``base- < slug < base.`` covers exactly the slugs that start with
+    ``base-`` and, unlike ``LIKE``, uses the unique index on every backend.
+    """
+    condition = Q()
+    for base in bases:
+        condition |= Q(**{field: base}) | Q(**{f"{field}__gt": f"{base}-", f"{field}__lt": f"{base}."})
+    highest = dict.fromkeys(bases, 0)
+    for slug in model._default_manager.filter(condition).values_list(field, flat=True):
+        for base in (slug, slug.rsplit("-", 1)[0]):
+            if base in highest:
+                highest[base] = max(highest[base], _suffix(slug, base))
+    return highest
+
+
+def allocate_slugs(model, texts, field="slug"):
+    """Return one unique slug per entry of ``texts``, in order.
+
+    Suffixes are reserved through ``SlugSequence`` with a single upsert per
+    distinct batch size (``last_suffix = max(last_suffix, taken) + n``), so
+    concurrent creators are handed different slugs instead of colliding on
+    the unique index. Existing slugs are read once, with
+    :func:`_taken_suffixes`.
+    """
+    from .models import SlugSequence
+
+    bases = [slug_base(model, text, field) for text in texts]
+    if not bases:
+        return []
+    needed = Counter(bases)
+    taken = _taken_suffixes(model, list(needed), field)
+
+    scope = slug_scope(model)
+    using = router.db_for_write(SlugSequence)
+    table = connections[using].ops.quote_name(SlugSequence._meta.db_table)
+    by_count = defaultdict(list)
+    for base, count in needed.items():
+        by_count[count].append(base)
+
+    last = {}
+    with connections[using].cursor() as cursor:
+        for count, group in by_count.items():
+            rows = ", ".join(["(%s, %s, %s)"] * len(group))
+            params = []
+            for base in group:
+                params.extend([scope, base, taken[base] + count])
+            cursor.execute(
+                f"INSERT INTO {table} (scope, base, last_suffix) VALUES {rows} "
+                f"ON CONFLICT (scope, base) DO UPDATE SET last_suffix = CASE "
+                f"WHEN {table}.last_suffix + %s > excluded.last_suffix "
+                f"THEN {table}.last_suffix + %s ELSE excluded.last_suffix END "
+                f"RETURNING base, last_suffix",
+                params + [count, count],
+            )
+            last.update(cursor.fetchall())
+
+    next_suffix = {base: last[base] - count + 1 for base, count in needed.items()}
+    slugs = []
+    for base in bases:
+        suffix = next_suffix[base]
+        next_suffix[base] += 1
+        slugs.append(base if suffix == 1 else f"{base}-{suffix}")
+    return slugs
+
+
+def allocate_slug(model, text, field="slug"):
+    return allocate_slugs(model, [text], field)[0]
+
+
+def record_slug_change(instance, old_slug, field="slug"):
+    """Remember ``old_slug`` so links to it keep resolving to ``instance``."""
+    from .models import SlugHistory
+
+    scope = slug_scope(type(instance))
+    SlugHistory.objects.filter(scope=scope, slug=getattr(instance, field)).delete()
+    SlugHistory.objects.update_or_create(scope=scope, slug=old_slug, defaults={"object_id": instance.pk})
+
+
+def current_slug(model, old_slug, field="slug"):
+    """Resolve a retired slug to the object's current one in a single query."""
+    from .models import SlugHistory
+
+    history = SlugHistory.objects.filter(scope=slug_scope(model), slug=old_slug).values("object_id")
+    return model._default_manager.filter(pk__in=Subquery(history)).values_list(field, flat=True).first()
+
+
+async def acurrent_slug(model, old_slug, field="slug"):
+    from .models import SlugHistory
+
+    history = SlugHistory.objects.filter(scope=slug_scope(model), slug=old_slug).values("object_id")
+    return await model._default_manager.filter(pk__in=Subquery(history)).values_list(field, flat=True).afirst()
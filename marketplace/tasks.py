@@ -0,0 +1,28 @@
+from django.core.mail import EmailMultiAlternatives
+
+from .images import generate_product_derivatives
+from .jobs import task
+from .models import Order, OrderItem, Product
+from .rollups import record_order_sales
+
+
+@task("images.generate_product_derivatives")
+def generate_product_image_derivatives(product_id):
+    product = Product.objects.filter(pk=product_id).only("id", "image", "image_derivatives").first()
+    if product is not None:
+        generate_product_derivatives(product)
+
+
+@task("mail.send")
+def send_email(subject, body, to, from_email=None, html_body=None):
+    message = EmailMultiAlternatives(subject, body, from_email, to)
+    if html_body:
+        message.attach_alternative(html_body, "text/html")
+    message.send()
+
+
+@task("rollups.record_order_sales")
+def record_order_sales_job(order_id):
+    order = Order.objects.filter(pk=order_id).first()
+    if order is not None:
+        record_order_sales(order, OrderItem.objects.filter(order=order).select_related("product"))
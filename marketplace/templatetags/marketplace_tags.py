@@ -0,0 +1,99 @@
+import hashlib
+
+from django import template
+from django.template.loader import render_to_string
+from django.utils.html import format_html
+
+from ..cache import PRODUCT_CARD_NAMESPACE, cached_fragment
+from ..images import srcset
+
+register = template.Library()
+
+
+@register.simple_tag
+def product_card(product):
+    """Render ``products/partials/product_card.html`` through the fragment cache.
+
+    Cards are keyed on the product's id and ``updated_at`` (which rating and
+    stock updates also bump) plus a version that category changes bump, so
+    an edit only re-renders the cards it affects.
+    """
+    return cached_fragment(
+        "product_card",
+        [product.pk, product.updated_at.timestamp()],
+        lambda: render_to_string("products/partials/product_card.html", {"product": product}),
+        namespace=PRODUCT_CARD_NAMESPACE,
+    )
+
+
+@register.filter
+def card_versions(products):
+    """A short digest of each product's id and ``updated_at``.
+
+    Pass it as a ``fragmentcache`` vary_on so a section of product cards
+    is re-rendered whenever one of its cards would be. Evaluating the
+    queryset here fills its result cache, so the section's loop does not
+    run the query again.
+    """
+    stamp = ",".join(f"{product.pk}:{product.updated_at.timestamp()}" for product in products)
+    return hashlib.md5(stamp.encode(), usedforsecurity=False).hexdigest()
+
+
+@register.simple_tag
+def product_image(product, sizes="100vw", css_class="", loading="lazy"):
+    """Render a product image as a ``<picture>`` with WebP and JPEG ``srcset``.
+
+    Falls back to a plain ``<img>`` of the original upload until the
+    derivatives have been generated.
+    """
+    widths = product.image_derivatives
+    if not widths:
+        return format_html(
+            '<img src="{}" alt="{}" class="{}" loading="{}" decoding="async" />',
+            product.image.url,
+            product.name,
+            css_class,
+            loading,
+        )
+    return format_html(
+        '<picture><source type="image/webp" srcset="{}" sizes="{}" />'
+        '<img src="{}" srcset="{}" sizes="{}" alt="{}" class="{}" loading="{}" decoding="async" /></picture>',
+        srcset(product.image, widths, "webp"),
+        sizes,
+        product.image.url,
+        srcset(product.image, widths, "jpg"),
+        sizes,
+        product.name,
+        css_class,
+        loading,
+    )
+
+
+class FragmentCacheNode(template.Node):
+    def __init__(self, nodelist, name, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        name = self.name.resolve(context)
+        vary_on = [variable.resolve(context) for variable in self.vary_on]
+        return cached_fragment(name, vary_on, lambda: self.nodelist.render(context))
+
+
+@register.tag
+def fragmentcache(parser, token):
+    """Cache a template section until the catalog changes.
+
+    Usage: ``{% fragmentcache "home_featured" [vary_on ...] %} ... {% endfragmentcache %}``
+    """
+    bits = token.split_contents()
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(f"'{bits[0]}' tag requires a fragment name.")
+    nodelist = parser.parse(("endfragmentcache",))
+    parser.delete_first_token()
+    return FragmentCacheNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        [parser.compile_filter(bit) for bit in bits[2:]],
+    )
@@ -2,6 +2,7 @@ from django.contrib.auth import views as auth_views
 from django.urls import path
 
 from . import views
+from .forms import QueuedPasswordResetForm
 
 urlpatterns = [
     path("", views.home, name="home"),
@@ -10,7 +11,9 @@ urlpatterns = [
     path("logout/", auth_views.LogoutView.as_view(next_page='home'), name="logout"),
     path(
         "password-reset/",
-        auth_views.PasswordResetView.as_view(template_name="accounts/password_reset.html"),
+        auth_views.PasswordResetView.as_view(
+            template_name="accounts/password_reset.html", form_class=QueuedPasswordResetForm
+        ),
         name="password_reset",
     ),
     path(
@@ -37,8 +40,15 @@ urlpatterns = [
     path("checkout/", views.checkout, name="checkout"),
     path("orders/", views.order_list, name="order_list"),
     path("dashboard/seller/", views.seller_dashboard, name="seller_dashboard"),
+    path("dashboard/seller/products/", views.seller_products, name="seller_products"),
+    path("dashboard/seller/orders/", views.seller_orders, name="seller_orders"),
+    path("export/products.<str:format>", views.export_products, name="export_products"),
+    path("export/orders.<str:format>", views.export_orders, name="export_orders"),
+    path("ops/metrics/", views.request_metrics, name="request_metrics"),
     path("api/products/", views.ProductListAPI.as_view(), name="api_products"),
     path("api/categories/", views.CategoryListAPI.as_view(), name="api_categories"),
     path("api/orders/", views.OrderHistoryAPI.as_view(), name="api_orders"),
+    path("api/cart/", views.CartAPI.as_view(), name="api_cart"),
+    path("api/products/import/", views.ProductImportAPI.as_view(), name="api_product_import"),
 ]
 
@@ -1,14 +1,56 @@
+import io
+from datetime import timedelta
+from decimal import Decimal, InvalidOperation
+from functools import wraps
+
+from asgiref.sync import sync_to_async
 from django.contrib import messages
 from django.contrib.auth import authenticate, login
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q, Sum
+from django.db.models import Exists, OuterRef, Prefetch
+from django.core.exceptions import PermissionDenied
+from django.http import Http404, JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
-
-from rest_framework import generics
-
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from rest_framework import permissions
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from . import cart as cart_service
+from .async_api import AsyncListAPIView
+from .cache import fragment_stats
+from .checkout import EmptyCart, InsufficientStock, place_order
+from .exports import CONTENT_TYPES, ORDER_LINE_COLUMNS, PRODUCT_COLUMNS, streaming_export
 from .forms import CheckoutForm, ProductForm, ReviewForm, UserRegistrationForm
-from .models import Cart, CartItem, Category, Order, OrderItem, Product, Review
-from .serializers import CategorySerializer, OrderSerializer, ProductSerializer
+from .imports import ImportFormatError, format_for_filename, import_products
+from .instrumentation import database_stats, request_stats
+from .models import Cart, Category, Order, OrderItem, Product, Review
+from .orders import aattach_items, attach_items, order_history
+from .pagination import InvalidCursor, KeysetPaginator
+from .rollups import seller_daily_series, seller_sales_summary
+from .search import SEARCH_ORDERING, search_products
+from .serializers import (
+    CartItemSerializer,
+    CartUpdateSerializer,
+    CategorySerializer,
+    OrderSerializer,
+    ProductSerializer,
+)
+from .slugs import acurrent_slug
+
+PRODUCTS_PER_PAGE = 24
+SELLER_DASHBOARD_PREVIEW = 5
+SELLER_PAGE_SIZE = 20
+ORDERS_PER_PAGE = 20
+
+# Templates, context processors and the session are synchronous, so async
+# views fetch their rows with the async ORM and render in a thread.
+arender = sync_to_async(render)
 
 
 def signup(request):
@@ -27,10 +69,14 @@ def signup(request):
     return render(request, "accounts/signup.html", {"form": form})
 
 
-def home(request):
-    featured_products = Product.objects.filter(is_featured=True)[:8]
-    latest_products = Product.objects.all()[:12]
-    return render(
+async def home(request):
+    # The querysets stay lazy and are evaluated inside the render thread. The
+    # sections are fragment cached per set of card versions, so a hit costs
+    # one query per section and re-renders nothing.
+    products = Product.objects.select_related("category")
+    featured_products = products.filter(is_featured=True)[:8]
+    latest_products = products[:12]
+    return await arender(
         request,
         "home.html",
         {
@@ -40,42 +86,104 @@ def home(request):
     )
 
 
-def product_list(request):
-    products = Product.objects.select_related("category", "seller")
-    query = request.GET.get("q")
-    category_slug = request.GET.get("category")
-    min_price = request.GET.get("min_price")
-    max_price = request.GET.get("max_price")
+def _price_params(params):
+    """``min_price``/``max_price`` as Decimals, plus errors for values that are not numbers."""
+    prices, errors = {}, {}
+    for name in ("min_price", "max_price"):
+        value = params.get(name)
+        if not value:
+            continue
+        try:
+            price = Decimal(value)
+        except InvalidOperation:
+            price = None
+        if price is None or not price.is_finite():
+            errors[name] = ["A valid number is required."]
+        else:
+            prices[name] = price
+    return prices, errors
+
+
+def _filter_products(products, params, strict=False):
+    """Apply the catalog filters and return ``(queryset, keyset ordering)``.
+
+    Searches are ordered by relevance, everything else newest first.
+    Malformed prices are ignored, or raise a DRF ``ValidationError`` when
+    ``strict``.
+    """
+    query = params.get("q")
+    category_slug = params.get("category")
+    prices, errors = _price_params(params)
+    if strict and errors:
+        raise ValidationError(errors)
+    ordering = Product._meta.ordering
 
     if query:
-        products = products.filter(Q(name__icontains=query) | Q(description__icontains=query))
+        products = search_products(products, query)
+        ordering = SEARCH_ORDERING
     if category_slug:
         products = products.filter(category__slug=category_slug)
-    if min_price:
-        products = products.filter(price__gte=min_price)
-    if max_price:
-        products = products.filter(price__lte=max_price)
+    if "min_price" in prices:
+        products = products.filter(price__gte=prices["min_price"])
+    if "max_price" in prices:
+        products = products.filter(price__lte=prices["max_price"])
+    if params.get("in_stock"):
+        products = products.filter(stock__gt=0)
+    return products, ordering
 
-    return render(
+
+def _page(paginator, request):
+    # A mangled or stale cursor falls back to the first page.
+    try:
+        return paginator.page(request.GET.get("cursor"))
+    except InvalidCursor:
+        return paginator.page()
+
+
+async def product_list(request):
+    query = request.GET.get("q")
+    category_slug = request.GET.get("category")
+    products, ordering = _filter_products(Product.objects.select_related("category", "seller"), request.GET)
+
+    paginator = KeysetPaginator(products, ordering, per_page=PRODUCTS_PER_PAGE)
+    try:
+        page = await paginator.apage(request.GET.get("cursor"))
+    except InvalidCursor:
+        page = await paginator.apage()
+    if category_slug and not page and not request.GET.get("cursor"):
+        new_slug = await acurrent_slug(Category, category_slug)
+        if new_slug is not None:
+            params = request.GET.copy()
+            params["category"] = new_slug
+            return redirect(f"{request.path}?{params.urlencode()}", permanent=True)
+    await page.aload_count()
+
+    return await arender(
         request,
         "products/product_list.html",
-        {"products": products, "active_category": category_slug, "query": query},
+        {"products": page, "page": page, "active_category": category_slug, "query": query},
     )
 
 
-def product_detail(request, slug):
-    product = get_object_or_404(Product.objects.select_related("category", "seller"), slug=slug)
-    reviews = product.reviews.select_related("user")
+async def product_detail(request, slug):
+    try:
+        product = await Product.objects.select_related("category", "seller").aget(slug=slug)
+    except Product.DoesNotExist:
+        new_slug = await acurrent_slug(Product, slug)
+        if new_slug is None:
+            raise Http404("No product matches the given query.")
+        return redirect("product_detail", slug=new_slug, permanent=True)
     form = ReviewForm()
     if request.method == "POST":
-        if not request.user.is_authenticated:
+        user = await request.auser()
+        if not user.is_authenticated:
             messages.error(request, "Please log in to leave a review.")
             return redirect("login")
         form = ReviewForm(request.POST)
         if form.is_valid():
-            Review.objects.update_or_create(
+            await Review.objects.aupdate_or_create(
                 product=product,
-                user=request.user,
+                user=user,
                 defaults={
                     "rating": form.cleaned_data["rating"],
                     "comment": form.cleaned_data["comment"],
@@ -83,7 +191,10 @@ def product_detail(request, slug):
             )
             messages.success(request, "Your review has been saved.")
             return redirect("product_detail", slug=slug)
-    return render(request, "products/product_detail.html", {"product": product, "reviews": reviews, "form": form})
+    reviews = [review async for review in product.reviews.select_related("user")]
+    return await arender(
+        request, "products/product_detail.html", {"product": product, "reviews": reviews, "form": form}
+    )
 
 
 def _get_user_cart(user):
@@ -98,13 +209,10 @@ def add_to_cart(request, slug):
         messages.error(request, "This product is currently out of stock.")
         return redirect("product_detail", slug=slug)
     cart = _get_user_cart(request.user)
-    item, created = CartItem.objects.get_or_create(cart=cart, product=product)
-    if not created:
-        if item.quantity >= product.stock:
-            messages.warning(request, "You've added the maximum available stock.")
-            return redirect("product_detail", slug=slug)
-        item.quantity += 1
-        item.save()
+    if cart_service.add_item(cart, product) is None:
+        messages.warning(request, "You've added the maximum available stock.")
+        return redirect("product_detail", slug=slug)
+    cart_service.adjust_cart_item_count(request, 1)
     messages.success(request, f"{product.name} added to your cart.")
     return redirect("product_detail", slug=slug)
 
@@ -112,15 +220,16 @@ def add_to_cart(request, slug):
 @login_required
 def view_cart(request):
     cart = _get_user_cart(request.user)
-    items = cart.items.select_related("product")
-    return render(request, "orders/cart.html", {"cart": cart, "items": items})
+    items = list(cart.items.select_related("product__category"))
+    return render(request, "orders/cart.html", {"cart": cart, "items": items, "summary": cart.summary(items)})
 
 
 @login_required
 def remove_cart_item(request, item_id):
     cart = _get_user_cart(request.user)
-    item = get_object_or_404(CartItem, pk=item_id, cart=cart)
-    item.delete()
+    if not cart_service.remove_item(cart, item_id):
+        raise Http404("No such cart item.")
+    cart_service.forget_cart_item_count(request)
     messages.info(request, "Item removed from cart.")
     return redirect("view_cart")
 
@@ -128,17 +237,23 @@ def remove_cart_item(request, item_id):
 @login_required
 def update_cart_item(request, item_id):
     cart = _get_user_cart(request.user)
-    item = get_object_or_404(CartItem, pk=item_id, cart=cart)
-    quantity = int(request.POST.get("quantity", item.quantity))
+    try:
+        quantity = int(request.POST["quantity"])
+    except (KeyError, ValueError):
+        messages.error(request, "Please enter a valid quantity.")
+        return redirect("view_cart")
     if quantity <= 0:
-        item.delete()
+        if not cart_service.remove_item(cart, item_id):
+            raise Http404("No such cart item.")
     else:
-        max_allowed = item.product.stock
-        if quantity > max_allowed:
-            quantity = max_allowed
+        stored = cart_service.set_item_quantity(cart, item_id, quantity)
+        if stored is None:
+            raise Http404("No such cart item.")
+        if stored == 0:
+            messages.warning(request, "That product is out of stock and was removed from your cart.")
+        elif stored < quantity:
             messages.warning(request, "Quantity adjusted based on stock availability.")
-        item.quantity = quantity
-        item.save()
+    cart_service.forget_cart_item_count(request)
     messages.success(request, "Cart updated.")
     return redirect("view_cart")
 
@@ -146,106 +261,271 @@ def update_cart_item(request, item_id):
 @login_required
 def checkout(request):
     cart = _get_user_cart(request.user)
-    items = cart.items.select_related("product")
-    if not items.exists():
+    items = list(cart.items.select_related("product"))
+    if not items:
         messages.warning(request, "Your cart is empty.")
         return redirect("product_list")
 
     if request.method == "POST":
         form = CheckoutForm(request.POST)
         if form.is_valid():
-            order = Order.objects.create(
-                user=request.user,
-                full_name=form.cleaned_data["full_name"],
-                shipping_address=form.cleaned_data["shipping_address"],
-                contact_number=form.cleaned_data["contact_number"],
-                payment_method=form.cleaned_data["payment_method"],
-                payment_status=Order.PAYMENT_STATUS_PAID if form.cleaned_data["payment_method"] == Order.PAYMENT_METHOD_PICKUP else Order.PAYMENT_STATUS_PENDING
-            )
-            for item in items:
-                OrderItem.objects.create(
-                    order=order,
-                    product=item.product,
-                    quantity=item.quantity,
-                    price=item.product.price,
-                )
-                item.product.stock = max(0, item.product.stock - item.quantity)
-                item.product.save(update_fields=["stock"])
-            cart.items.all().delete()
-            order.recalculate_total()
+            try:
+                place_order(request.user, cart, **form.cleaned_data)
+            except InsufficientStock as exc:
+                messages.error(request, f"{exc} Please update your cart.")
+                return redirect("view_cart")
+            except EmptyCart:
+                messages.warning(request, "Your cart is empty.")
+                return redirect("product_list")
+            cart_service.refresh_cart_item_count(request, 0)
             messages.success(request, "Order placed successfully!")
             return redirect("order_list")
     else:
         form = CheckoutForm(initial={"full_name": request.user.get_full_name()})
-    return render(request, "orders/checkout.html", {"cart": cart, "items": items, "form": form})
+    return render(
+        request,
+        "orders/checkout.html",
+        {"cart": cart, "items": items, "summary": cart.summary(items), "form": form},
+    )
 
 
 @login_required
 def order_list(request):
-    orders = request.user.orders.prefetch_related("items__product")
-    return render(request, "orders/order_list.html", {"orders": orders})
+    paginator = KeysetPaginator(order_history(request.user), per_page=ORDERS_PER_PAGE)
+    page = _page(paginator, request)
+    attach_items(page.object_list)
+    return render(request, "orders/order_list.html", {"orders": page, "page": page})
+
+
+def _sales_range(params, default_days=30, max_days=366):
+    today = timezone.localdate()
+    end = parse_date(params.get("end") or "") or today
+    start = parse_date(params.get("start") or "") or end - timedelta(days=default_days - 1)
+    if start > end:
+        start, end = end, start
+    start = max(start, end - timedelta(days=max_days - 1))
+    return start, end
+
+
+def seller_required(view_func):
+    @login_required
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        profile = getattr(request.user, "profile", None)
+        if not profile or not profile.is_seller:
+            messages.error(request, "Seller access required.")
+            return redirect("home")
+        return view_func(request, *args, **kwargs)
 
+    return wrapper
+
+
+def _seller_orders(seller):
+    """Orders containing ``seller``'s products, each with only their lines.
+
+    The lines land on ``order.seller_items`` via one prefetch query per page.
+    """
+    seller_items = OrderItem.objects.filter(product__seller=seller).select_related("product").order_by("id")
+    return Order.objects.filter(
+        Exists(OrderItem.objects.filter(order=OuterRef("pk"), product__seller=seller))
+    ).prefetch_related(Prefetch("items", queryset=seller_items, to_attr="seller_items"))
 
-@login_required
-def seller_dashboard(request):
-    profile = getattr(request.user, "profile", None)
-    if not profile or not profile.is_seller:
-        messages.error(request, "Seller access required.")
-        return redirect("home")
 
+def _with_seller_totals(orders):
+    orders = list(orders)
+    for order in orders:
+        order.seller_total = sum((item.subtotal for item in order.seller_items), Decimal("0.00"))
+    return orders
+
+
+@seller_required
+def seller_dashboard(request):
     products = request.user.products.all()
-    orders = Order.objects.filter(items__product__seller=request.user).distinct()
-    categories = Category.objects.all()  # Get all categories
-    stats = {
-        "total_products": products.count(),
-        "total_orders": orders.count(),
-        "total_revenue": orders.aggregate(total=Sum("total"))["total"] or 0,
-    }
-    
+    stats = {"total_products": products.count(), **seller_sales_summary(request.user)}
+    start, end = _sales_range(request.GET)
+    sales_series = seller_daily_series(request.user, start, end)
+    peak_revenue = max((day["revenue"] for day in sales_series), default=0) or 1
+    for day in sales_series:
+        day["height"] = int(day["revenue"] * 100 / peak_revenue)
+
     if request.method == "POST":
         form = ProductForm(request.POST, request.FILES)
         if form.is_valid():
-            product = form.save(commit=False)
-            product.seller = request.user
-            product.save()
+            form.instance.seller = request.user
+            form.save()
             messages.success(request, "Product saved successfully!")
             return redirect("seller_dashboard")
         else:
             messages.error(request, "Please correct the errors below.")
     else:
-        # Initialize the form with categories
         form = ProductForm()
-        # Set the category field queryset to include all categories
-        form.fields['category'].queryset = Category.objects.all()
-        
+
     return render(
         request,
         "dashboard/seller_dashboard.html",
         {
-            "products": products, 
-            "orders": orders, 
-            "stats": stats, 
+            "products": products[:SELLER_DASHBOARD_PREVIEW],
+            "orders": _with_seller_totals(_seller_orders(request.user)[:SELLER_DASHBOARD_PREVIEW]),
+            "stats": stats,
             "form": form,
-            "categories": categories,  # Add categories to context
+            "sales_series": sales_series,
+            "sales_range": {"start": start, "end": end, **seller_sales_summary(request.user, start, end)},
         },
     )
 
 
-class ProductListAPI(generics.ListAPIView):
+@seller_required
+def seller_products(request):
+    paginator = KeysetPaginator(request.user.products.select_related("category"), per_page=SELLER_PAGE_SIZE)
+    page = _page(paginator, request)
+    return render(request, "dashboard/seller_products.html", {"products": page, "page": page})
+
+
+@seller_required
+def seller_orders(request):
+    paginator = KeysetPaginator(_seller_orders(request.user), per_page=SELLER_PAGE_SIZE)
+    page = _page(paginator, request)
+    _with_seller_totals(page)
+    return render(request, "dashboard/seller_orders.html", {"orders": page, "page": page})
+
+
+def export_products(request, format):
+    if format not in CONTENT_TYPES:
+        raise Http404("Unknown export format.")
+    products, _ = _filter_products(Product.objects.all(), request.GET)
+    return streaming_export(request, products, PRODUCT_COLUMNS, format, "products")
+
+
+@login_required
+def export_orders(request, format):
+    """Order lines for staff (every order) or a seller (their own lines)."""
+    if format not in CONTENT_TYPES:
+        raise Http404("Unknown export format.")
+    lines = OrderItem.objects.all()
+    if not request.user.is_staff:
+        profile = getattr(request.user, "profile", None)
+        if not profile or not profile.is_seller:
+            raise PermissionDenied("Seller or staff access required.")
+        lines = lines.filter(product__seller=request.user)
+    start, end = _sales_range(request.GET, default_days=366)
+    lines = lines.filter(order__created_at__date__range=(start, end))
+    return streaming_export(request, lines, ORDER_LINE_COLUMNS, format, f"orders-{start}-{end}")
+
+
+@staff_member_required
+def request_metrics(request):
+    """Rolling per-view request metrics, fragment cache hit rates and connection pools for this process."""
+    return JsonResponse({"views": request_stats(), "fragments": fragment_stats(), "database": database_stats()})
+
+
+class ProductListAPI(AsyncListAPIView):
     queryset = Product.objects.select_related("category", "seller")
     serializer_class = ProductSerializer
 
+    def get_queryset(self):
+        queryset, self.ordering = _filter_products(
+            super().get_queryset(), self.request.query_params, strict=True
+        )
+        return queryset
+
 
-class CategoryListAPI(generics.ListAPIView):
+class CategoryListAPI(AsyncListAPIView):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    ordering = ("name", "id")
 
 
-class OrderHistoryAPI(generics.ListAPIView):
+class OrderHistoryAPI(AsyncListAPIView):
     serializer_class = OrderSerializer
 
     def get_queryset(self):
         user = self.request.user
         if user.is_authenticated:
-            return user.orders.prefetch_related("items__product")
+            return order_history(user)
         return Order.objects.none()
+
+    async def aload_page(self, rows):
+        return await aattach_items(rows)
+
+
+class CartAPI(APIView):
+    """Read the cart, or apply a batch of ``{product, quantity}`` changes.
+
+    ``PATCH``/``POST`` bodies look like ``{"items": [{"product": 3,
+    "quantity": 2}]}``; a quantity of 0 removes the line. The response is
+    the updated cart either way.
+    """
+
+    permission_classes = [permissions.IsAuthenticated]
+
+    def _cart_response(self, cart, adjusted=None):
+        items = list(cart.items.select_related("product").order_by("id"))
+        summary = cart.summary(items)
+        cart_service.refresh_cart_item_count(self.request, summary["total_items"])
+        return Response(
+            {
+                "items": CartItemSerializer(items, many=True).data,
+                "total_items": summary["total_items"],
+                "total_price": f"{summary['total_price']:.2f}",
+                "adjusted": adjusted or [],
+            }
+        )
+
+    def get(self, request):
+        return self._cart_response(_get_user_cart(request.user))
+
+    def patch(self, request):
+        serializer = CartUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        quantities = {line["product"]: line["quantity"] for line in serializer.validated_data["items"]}
+        cart = _get_user_cart(request.user)
+        try:
+            stored = cart_service.apply_quantities(cart, quantities)
+        except cart_service.UnknownProducts as exc:
+            raise ValidationError({"items": [f"Unknown product ids: {exc.product_ids}"]})
+        adjusted = [
+            {"product": product_id, "requested": quantities[product_id], "quantity": quantity}
+            for product_id, quantity in stored.items()
+            if quantity != quantities[product_id]
+        ]
+        return self._cart_response(cart, adjusted)
+
+    post = patch
+
+
+class IsSeller(permissions.BasePermission):
+    message = "Seller access required."
+
+    def has_permission(self, request, view):
+        profile = getattr(request.user, "profile", None)
+        return bool(profile and profile.is_seller)
+
+
+class ProductImportAPI(APIView):
+    """Create or update the seller's products from an uploaded file.
+
+    Send a ``.csv`` or ``.ndjson`` file as the multipart field ``file``;
+    ``?dry_run=1`` only validates. Rows that fail validation are skipped
+    and listed under ``errors`` with their line numbers.
+    """
+
+    permission_classes = [permissions.IsAuthenticated, IsSeller]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        upload = request.data.get("file")
+        if upload is None:
+            raise ValidationError({"file": ["Upload a CSV or NDJSON file."]})
+        stream = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+        try:
+            report = import_products(
+                request.user,
+                stream,
+                format_for_filename(upload.name),
+                dry_run=request.query_params.get("dry_run") in ("1", "true"),
+            )
+        except (ImportFormatError, UnicodeDecodeError) as exc:
+            raise ValidationError({"file": [str(exc)]})
+        finally:
+            stream.detach()
+        return Response(report.as_dict())